@@ -1,7 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.session import SessionLocal
+from app.db.session import get_db
+from app.db.routing import get_read_db, get_async_read_db
 from app.models.amenities import Amenity
 from app.models.hall_amenities import HallAmenity
 from app.models.hall import Hall
@@ -12,15 +15,6 @@ from app.core.auth_utils import decode_token   # <-- Unified decoder
 router = APIRouter(prefix="/amenities", tags=["Amenities"])
 
 
-# ---------------- DB SESSION ----------------
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 # ---------------- VALIDATE ADMIN ----------------
 def require_admin(token: str):
     payload = decode_token(token)      # <-- Shared decode
@@ -94,15 +88,16 @@ def assign_amenities(
 #                           LIST ALL AMENITIES
 # =====================================================================
 @router.get("/", response_model=list[AmenityOut])
-def list_amenities(db: Session = Depends(get_db)):
-    return db.query(Amenity).all()
+async def list_amenities(db: AsyncSession = Depends(get_async_read_db)):
+    result = await db.execute(select(Amenity))
+    return result.scalars().all()
 
 
 # =====================================================================
 #                     GET AMENITIES FOR A SPECIFIC HALL
 # =====================================================================
 @router.get("/hall/{hall_id}", response_model=list[AmenityOut])
-def hall_amenities(hall_id: int, db: Session = Depends(get_db)):
+def hall_amenities(hall_id: int, db: Session = Depends(get_read_db)):
 
     hall = db.query(Hall).filter(Hall.id == hall_id, Hall.deleted == False).first()
     if not hall:
@@ -1,31 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 
-from app.db.session import SessionLocal
+from app.db.session import get_db
 from app.schemas.admin import AdminCreate, AdminLogin
 from app.schemas.user import UserCreate, UserLogin
 from app.models.admin import Admin
 from app.models.user import User
-from app.core.security import hash_password, verify_password
+from app.core.security import hash_password, verify_and_update
 from app.core.jwt import create_access_token  # <-- Correct import
+from app.core.principals import load_principal
+from app.core.rate_limit import throttle_auth
+from app.core.refresh_tokens import (
+    issue_refresh_token, rotate_refresh_token, revoke_family, find_refresh_token
+)
+from app.schemas.auth import RefreshRequest
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
-# ---------------- DB SESSION ----------------
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 # =====================================================================
 #                           ADMIN REGISTER
 # =====================================================================
 @router.post("/admin/register")
-def admin_register(data: AdminCreate, db: Session = Depends(get_db)):
+def admin_register(data: AdminCreate, request: Request, db: Session = Depends(get_db)):
+    throttle_auth(request, "register")
+
     if db.query(Admin).filter(Admin.email == data.email).first():
         raise HTTPException(status_code=400, detail="Admin already exists")
 
@@ -42,16 +41,30 @@ def admin_register(data: AdminCreate, db: Session = Depends(get_db)):
 #                           ADMIN LOGIN
 # =====================================================================
 @router.post("/admin/login")
-def admin_login(data: AdminLogin, db: Session = Depends(get_db)):
+def admin_login(data: AdminLogin, request: Request, db: Session = Depends(get_db)):
+    throttle_auth(request, "admin_login", data.email)
+
     admin = db.query(Admin).filter(Admin.email == data.email).first()
 
-    if not admin or not verify_password(data.password, admin.password_hash):
+    if not admin:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    token = create_access_token({"sub": admin.email, "role": "admin"})
+    valid, new_hash = verify_and_update(data.password, admin.password_hash)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    # Stored hash used an older cost factor: upgrade it now that we know the password
+    if new_hash:
+        admin.password_hash = new_hash
+
+    refresh_token = issue_refresh_token(db, "admin", admin.id)
+    db.commit()
+
+    token = create_access_token({"sub": admin.email, "role": "admin", "uid": admin.id})
 
     return {
         "access_token": token,
+        "refresh_token": refresh_token,
         "role": "admin",
         "token_type": "bearer"
     }
@@ -61,7 +74,9 @@ def admin_login(data: AdminLogin, db: Session = Depends(get_db)):
 #                           USER REGISTER
 # =====================================================================
 @router.post("/user/register")
-def user_register(data: UserCreate, db: Session = Depends(get_db)):
+def user_register(data: UserCreate, request: Request, db: Session = Depends(get_db)):
+    throttle_auth(request, "register")
+
     if db.query(User).filter(User.email == data.email).first():
         raise HTTPException(status_code=400, detail="User already exists")
 
@@ -78,16 +93,65 @@ def user_register(data: UserCreate, db: Session = Depends(get_db)):
 #                           USER LOGIN
 # =====================================================================
 @router.post("/user/login")
-def user_login(data: UserLogin, db: Session = Depends(get_db)):
+def user_login(data: UserLogin, request: Request, db: Session = Depends(get_db)):
+    throttle_auth(request, "user_login", data.email)
+
     user = db.query(User).filter(User.email == data.email).first()
 
-    if not user or not verify_password(data.password, user.password_hash):
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    valid, new_hash = verify_and_update(data.password, user.password_hash)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    token = create_access_token({"sub": user.email, "role": "user"})
+    # Stored hash used an older cost factor: upgrade it now that we know the password
+    if new_hash:
+        user.password_hash = new_hash
+
+    refresh_token = issue_refresh_token(db, "user", user.id)
+    db.commit()
+
+    token = create_access_token({"sub": user.email, "role": "user", "uid": user.id})
 
     return {
         "access_token": token,
+        "refresh_token": refresh_token,
         "role": "user",
         "token_type": "bearer"
     }
+
+
+# =====================================================================
+#                 REFRESH ACCESS TOKEN (NO PASSWORD)
+# =====================================================================
+@router.post("/refresh")
+def refresh_access_token(data: RefreshRequest, db: Session = Depends(get_db)):
+    row, refresh_token = rotate_refresh_token(db, data.refresh_token)
+
+    # Resolve the account before committing: if it is gone, the old token is
+    # not spent on a rotation the client never receives
+    principal = load_principal({"role": row.role, "uid": row.account_id}, db)
+    db.commit()
+
+    token = create_access_token({"sub": principal.email, "role": principal.role, "uid": principal.id})
+
+    return {
+        "access_token": token,
+        "refresh_token": refresh_token,
+        "role": principal.role,
+        "token_type": "bearer"
+    }
+
+
+# =====================================================================
+#                    LOGOUT (REVOKE REFRESH TOKEN)
+# =====================================================================
+@router.post("/logout")
+def logout(data: RefreshRequest, db: Session = Depends(get_db)):
+    row = find_refresh_token(db, data.refresh_token)
+    if row:
+        revoke_family(db, row.family_id)
+        db.commit()
+
+    return {"message": "Logged out successfully"}
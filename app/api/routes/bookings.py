@@ -1,99 +1,99 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import text, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
 from datetime import timedelta, date, datetime, time
-
-from app.db.session import SessionLocal
-from app.models.booking import Booking
+from calendar import monthrange
+import csv
+import io
+import json
+
+from app.db.session import get_db
+from app.db.locks import lock_halls, run_with_retries
+from app.db.routing import get_read_db, get_async_read_db, async_read_sessionmaker
+from app.models.booking import Booking, ACTIVE_STATUSES
 from app.models.user import User
 from app.models.admin import Admin
 from app.models.hall import Hall
-from app.schemas.booking import BookingCreate, BookingOut
+from app.schemas.booking import BookingCreate, BookingOut, QuoteRequest, RecurringBookingCreate
 from app.core.auth_utils import decode_token
+from app.core.principals import Principal, load_principal
 from app.utils.razorpay_client import razorpay_client  # NEW
+from app.utils.pricing import quote_cache
+from app.utils.metrics import (
+    BOOKINGS_CREATED, BOOKINGS_CANCELLED, PAYMENTS_VERIFIED, EXTERNAL_CALL_SECONDS
+)
+from app.utils.holds import hold_expiry, release_expired_holds
+from app.utils.recurrence import FREQUENCIES, MAX_INTERVAL, occurrence_dates, occurrence_window
+from app.utils.availability import (
+    booking_index, period_range, has_timezone, day_bitmap, free_day_offsets, busy_bins, free_runs
+)
 
 router = APIRouter(prefix="/bookings", tags=["Bookings"])
 
 
-# ---------------- DB SESSION ----------------
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 # ---------------- ROLE + USER/ADMIN RESOLUTION ----------------
 def resolve_token_user(token: str, db: Session):
-    payload = decode_token(token)
-
-    email = payload["sub"]
-    role = payload["role"]
-
-    if role == "admin":
-        admin = db.query(Admin).filter(Admin.email == email).first()
-        if not admin:
-            raise HTTPException(status_code=404, detail="Admin not found")
-        return admin, "admin"
+    # Cached by the token's uid claim: no DB round trip in the common case
+    principal = load_principal(decode_token(token), db)
+    return principal, principal.role
 
-    if role == "user":
-        user = db.query(User).filter(User.email == email).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        return user, "user"
-
-    raise HTTPException(status_code=401, detail="Invalid role")
-
-
-# =====================================================================
-#                       PRICING CALCULATION FUNCTION
-# =====================================================================
-def calculate_price(hall: Hall, start_date, end_date, start_time, end_time):
 
-    # SAME DAY — HOURLY
-    if start_date == end_date:
-        start_hr = start_time.hour + start_time.minute / 60
-        end_hr = end_time.hour + end_time.minute / 60
-        hours = end_hr - start_hr
-
-        if hours <= 0:
-            raise HTTPException(status_code=400, detail="Invalid hours")
-
-        total = hours * hall.price_per_hour
+def require_admin(token: str, db: Session = Depends(get_read_db)):
+    # Dependency form for async routes: FastAPI runs it in the threadpool
+    principal, role = resolve_token_user(token, db)
+    if role != "admin":
+        raise HTTPException(status_code=403, detail="Admins only")
+    return principal
 
-        # Weekend pricing
-        if start_date.weekday() >= 5:
-            total *= hall.weekend_price_multiplier
 
-        return round(total + hall.security_deposit, 2)
+# ---------------- RANGE HELPERS ----------------
+def find_conflict(db: Session, hall_id: int, starts_at: datetime, ends_at: datetime):
+    return db.query(Booking.id).filter(
+        Booking.hall_id == hall_id,
+        Booking.status.in_(ACTIVE_STATUSES),
+        Booking.period.overlaps(period_range(starts_at, ends_at)),
+        # Holds past expiry no longer count, even before the sweeper runs
+        or_(Booking.status == "booked", Booking.hold_expires_at > datetime.utcnow()),
+    ).first()
 
-    # MULTI-DAY PRICING
-    total = 0
 
-    # Day 1 partial hours
-    start_hours = 24 - (start_time.hour + start_time.minute / 60)
-    total += start_hours * hall.price_per_hour
+def parse_month(month: str):
+    """'YYYY-MM' -> (first day, last day) of that month"""
+    try:
+        year, month_num = map(int, month.split("-"))
+        start_date = date(year, month_num, 1)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid month format (YYYY-MM)")
 
-    # Full days between
-    full_days = (end_date - start_date).days - 1
-    if full_days > 0:
-        for d in range(full_days):
-            weekday = (start_date + timedelta(days=d + 1)).weekday()
-            rate = hall.price_per_day
-            if weekday >= 5:
-                rate *= hall.weekend_price_multiplier
-            total += rate
+    return start_date, date(year, month_num, monthrange(year, month_num)[1])
 
-    # Last day partial hours
-    end_hours = end_time.hour + end_time.minute / 60
-    total += end_hours * hall.price_per_hour
 
-    if end_date.weekday() >= 5:
-        total *= hall.weekend_price_multiplier
+def is_overlap_violation(exc: IntegrityError) -> bool:
+    # 23P01 = exclusion_violation (excl_bookings_hall_period)
+    return getattr(exc.orig, "pgcode", None) == "23P01"
 
-    total += hall.security_deposit
 
-    return round(total, 2)
+def save_booking(db: Session, booking: Booking):
+    """
+    Commit a new active booking; the exclusion constraint is the final
+    conflict check. If it fires, expired-but-unswept holds on the hall are
+    released and the insert is retried once.
+    """
+    for attempt in range(2):
+        db.add(booking)
+        try:
+            db.commit()
+            return
+        except IntegrityError as e:
+            db.rollback()
+            if not is_overlap_violation(e):
+                raise
+            if attempt or not release_expired_holds(db, booking.hall_id):
+                raise HTTPException(status_code=400, detail="Hall already booked for this time range")
+            lock_halls(db, [booking.hall_id])  # the release committed; re-take the lock
 
 
 # =====================================================================
@@ -112,27 +112,20 @@ def create_booking(data: BookingCreate, token: str, db: Session = Depends(get_db
         raise HTTPException(status_code=404, detail="Hall not found")
 
     # Validations
+    if has_timezone(data.start_time, data.end_time):
+        raise HTTPException(status_code=400, detail="Times must be local times without a UTC offset")
+
     if data.end_date < data.start_date:
         raise HTTPException(status_code=400, detail="End date cannot be before start date")
 
     if data.start_date == data.end_date and data.end_time <= data.start_time:
         raise HTTPException(status_code=400, detail="End time must be after start time")
 
-    # Overlap check
-    conflict = db.query(Booking).filter(
-        Booking.hall_id == data.hall_id,
-        Booking.status == "booked",
-        Booking.start_date <= data.end_date,
-        Booking.end_date >= data.start_date,
-        Booking.start_time <= data.end_time,
-        Booking.end_time >= data.start_time,
-    ).first()
-
-    if conflict:
-        raise HTTPException(status_code=400, detail="Hall already booked for this time range")
+    starts_at = datetime.combine(data.start_date, data.start_time)
+    ends_at = datetime.combine(data.end_date, data.end_time)
 
     # Calculate price
-    total_price = calculate_price(
+    total_price = quote_cache.get_price(
         hall,
         data.start_date,
         data.end_date,
@@ -140,6 +133,9 @@ def create_booking(data: BookingCreate, token: str, db: Session = Depends(get_db
         data.end_time
     )
 
+    # Online payments only hold the slot until checkout completes
+    online = data.payment_mode == "online"
+
     # Create booking object
     booking = Booking(
         user_id=user.id,
@@ -148,23 +144,40 @@ def create_booking(data: BookingCreate, token: str, db: Session = Depends(get_db
         end_date=data.end_date,
         start_time=data.start_time,
         end_time=data.end_time,  # FIXED BUG
-        status="booked",
+        status="held" if online else "booked",
+        hold_expires_at=hold_expiry() if online else None,
         total_price=total_price,
         payment_mode=data.payment_mode,
         payment_status="pending",
     )
 
-    db.add(booking)
-    db.commit()
+    # Serialized per hall: lock, check, insert, commit (retried on deadlock/lock timeout)
+    def write():
+        lock_halls(db, [data.hall_id])
+
+        # Overlap check: a "free" answer from the in-memory index skips the
+        # DB probe (the exclusion constraint still guards the insert); a hit,
+        # or a window the index cannot answer, is checked against the DB.
+        if booking_index.is_free(data.hall_id, starts_at, ends_at) is not True:
+            if find_conflict(db, data.hall_id, starts_at, ends_at):
+                raise HTTPException(status_code=400, detail="Hall already booked for this time range")
+
+        save_booking(db, booking)
+
+    run_with_retries(db, write)
     db.refresh(booking)
 
+    booking_index.add(booking.hall_id, booking.id, starts_at, ends_at)
+    BOOKINGS_CREATED.labels("online" if online else "venue").inc()
+
     # ONLINE PAYMENT FLOW
-    if data.payment_mode == "online":
-        rp_order = razorpay_client.order.create({
-            "amount": int(total_price * 100),
-            "currency": "INR",
-            "receipt": f"booking_{booking.id}"
-        })
+    if online:
+        with EXTERNAL_CALL_SECONDS.labels("razorpay", "order_create").time():
+            rp_order = razorpay_client.order.create({
+                "amount": int(total_price * 100),
+                "currency": "INR",
+                "receipt": f"booking_{booking.id}"
+            })
 
         booking.razorpay_order_id = rp_order["id"]
         db.commit()
@@ -174,7 +187,8 @@ def create_booking(data: BookingCreate, token: str, db: Session = Depends(get_db
             "booking_id": booking.id,
             "total_price": total_price,
             "razorpay_order_id": rp_order["id"],
-            "razorpay_key_id": razorpay_client.auth[0]
+            "razorpay_key_id": razorpay_client.auth[0],
+            "hold_expires_at": booking.hold_expires_at.isoformat()
         }
 
     # PAY AT VENUE
@@ -186,6 +200,219 @@ def create_booking(data: BookingCreate, token: str, db: Session = Depends(get_db
     }
 
 
+# =====================================================================
+#                    RECURRING / BULK BOOKINGS
+# =====================================================================
+MAX_OCCURRENCES = 366
+
+OCCURRENCE_CONFLICTS_SQL = text("""
+    SELECT o.idx
+    FROM unnest(CAST(:starts AS timestamp[]), CAST(:ends AS timestamp[]))
+         WITH ORDINALITY AS o(starts_at, ends_at, idx)
+    WHERE EXISTS (
+        SELECT 1 FROM bookings b
+        WHERE b.hall_id = :hall_id
+          AND b.status IN ('booked', 'held')
+          AND b.period && tsrange(o.starts_at, o.ends_at, '[)')
+    )
+""")
+
+
+@router.post("/recurring", response_model=dict)
+def create_recurring_booking(data: RecurringBookingCreate, token: str, db: Session = Depends(get_db)):
+
+    user, role = resolve_token_user(token, db)
+
+    if role != "user":
+        raise HTTPException(status_code=403, detail="Only users can book halls")
+
+    if data.freq not in FREQUENCIES:
+        raise HTTPException(status_code=400, detail="freq must be daily, weekly or monthly")
+
+    if data.mode not in ("all_or_nothing", "best_effort"):
+        raise HTTPException(status_code=400, detail="mode must be all_or_nothing or best_effort")
+
+    max_interval = MAX_INTERVAL[data.freq]
+    if not 1 <= data.interval <= max_interval:
+        raise HTTPException(status_code=400, detail=f"interval must be 1 to {max_interval} for {data.freq}")
+
+    if has_timezone(data.start_time, data.end_time):
+        raise HTTPException(status_code=400, detail="Times must be local times without a UTC offset")
+
+    if data.end_time == data.start_time:
+        raise HTTPException(status_code=400, detail="end_time must differ from start_time")
+
+    if data.count is None and data.until is None:
+        raise HTTPException(status_code=400, detail="Provide count or until")
+
+    if data.count is not None and data.count < 1:
+        raise HTTPException(status_code=400, detail="count must be at least 1")
+
+    if data.by_weekday and any(wd not in range(7) for wd in data.by_weekday):
+        raise HTTPException(status_code=400, detail="by_weekday values must be 0 (Mon) to 6 (Sun)")
+
+    hall = db.query(Hall).filter(Hall.id == data.hall_id, Hall.deleted == False).first()
+    if not hall:
+        raise HTTPException(status_code=404, detail="Hall not found")
+
+    try:
+        days = occurrence_dates(
+            data.start_date,
+            data.freq,
+            data.interval,
+            data.count,
+            data.until,
+            data.by_weekday if data.freq == "weekly" else None,
+            limit=MAX_OCCURRENCES + 1,
+        )
+        windows = [occurrence_window(d, data.start_time, data.end_time) for d in days]
+    except (OverflowError, ValueError):
+        # Stepping past year 9999
+        raise HTTPException(status_code=400, detail="Pattern runs past the supported date range")
+
+    if not days:
+        raise HTTPException(status_code=400, detail="Pattern produces no occurrences")
+    if len(days) > MAX_OCCURRENCES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_OCCURRENCES} occurrences per request")
+
+    prices = [
+        quote_cache.get_price(hall, starts_at.date(), ends_at.date(), data.start_time, data.end_time)
+        for starts_at, ends_at in windows
+    ]
+
+    # Lapsed payment holds would otherwise count as conflicts below
+    release_expired_holds(db, data.hall_id)
+
+    def write():
+        lock_halls(db, [data.hall_id])
+
+        # One round trip checks every occurrence against existing bookings
+        conflict_idx = {
+            idx - 1
+            for (idx,) in db.execute(OCCURRENCE_CONFLICTS_SQL, {
+                "hall_id": data.hall_id,
+                "starts": [w[0] for w in windows],
+                "ends": [w[1] for w in windows],
+            })
+        }
+        conflicts = [windows[i][0].date().isoformat() for i in sorted(conflict_idx)]
+
+        if conflicts and data.mode == "all_or_nothing":
+            raise HTTPException(
+                status_code=400,
+                detail={"message": "Hall already booked for some occurrences", "conflicts": conflicts}
+            )
+
+        rows = []
+        for i, (starts_at, ends_at) in enumerate(windows):
+            if i in conflict_idx:
+                continue
+            rows.append({
+                "user_id": user.id,
+                "hall_id": data.hall_id,
+                "start_date": starts_at.date(),
+                "end_date": ends_at.date(),
+                "start_time": data.start_time,
+                "end_time": data.end_time,
+                "status": "booked",
+                "total_price": prices[i],
+                "payment_mode": "venue",
+                "payment_status": "pending",
+            })
+
+        if not rows:
+            raise HTTPException(
+                status_code=400,
+                detail={"message": "Every occurrence is already booked", "conflicts": conflicts}
+            )
+
+        # Single multi-row INSERT ... RETURNING
+        try:
+            created = db.execute(
+                insert(Booking).values(rows).returning(
+                    Booking.id, Booking.start_date, Booking.start_time, Booking.end_date, Booking.end_time
+                )
+            ).all()
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            if is_overlap_violation(e):
+                raise HTTPException(status_code=409, detail="Bookings changed while saving, please retry")
+            raise
+
+        return created, rows, conflicts
+
+    created, rows, conflicts = run_with_retries(db, write)
+
+    for b in created:
+        booking_index.add(
+            data.hall_id,
+            b.id,
+            datetime.combine(b.start_date, b.start_time),
+            datetime.combine(b.end_date, b.end_time),
+        )
+    BOOKINGS_CREATED.labels("venue").inc(len(created))
+
+    return {
+        "message": "Recurring booking created. Pay at venue.",
+        "booking_ids": [b.id for b in created],
+        "total_price": round(sum(r["total_price"] for r in rows), 2),
+        "skipped_conflicts": conflicts,
+        "payment_status": "pending"
+    }
+
+
+# =====================================================================
+#                       BATCH PRICE QUOTES
+# =====================================================================
+MAX_QUOTE_ITEMS = 100
+
+
+@router.post("/quote")
+def quote_prices(data: QuoteRequest, db: Session = Depends(get_read_db)):
+
+    if len(data.items) > MAX_QUOTE_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_QUOTE_ITEMS} items per request")
+
+    hall_ids = {item.hall_id for item in data.items}
+    halls = {
+        h.id: h
+        for h in db.query(Hall).filter(Hall.id.in_(hall_ids), Hall.deleted == False).all()
+    }
+
+    quotes = []
+    for item in data.items:
+        quote = item.dict()
+        quote["total_price"] = None
+        quote["error"] = None
+
+        hall = halls.get(item.hall_id)
+        if not hall:
+            quote["error"] = "Hall not found"
+        elif item.end_date < item.start_date:
+            quote["error"] = "End date cannot be before start date"
+        else:
+            try:
+                quote["total_price"] = quote_cache.get_price(
+                    hall,
+                    item.start_date,
+                    item.end_date,
+                    item.start_time,
+                    item.end_time
+                )
+            except HTTPException as e:
+                quote["error"] = e.detail
+
+        quotes.append(quote)
+
+    return {"quotes": quotes}
+
+
+@router.get("/quote/cache-stats")
+def quote_cache_stats(admin: Principal = Depends(require_admin)):
+    return quote_cache.stats()
+
+
 # =====================================================================
 #                        VERIFY RAZORPAY PAYMENT
 # =====================================================================
@@ -202,6 +429,12 @@ def verify_payment(
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
 
+    # The signature only proves the payment belongs to *some* order: it must
+    # be this booking's order, or any cheap payment could confirm it
+    if not booking.razorpay_order_id or razorpay_order_id != booking.razorpay_order_id:
+        PAYMENTS_VERIFIED.labels("order_mismatch").inc()
+        raise HTTPException(status_code=400, detail="Order does not match booking")
+
     # Validate signature
     try:
         razorpay_client.utility.verify_payment_signature({
@@ -212,13 +445,44 @@ def verify_payment(
     except Exception:
         booking.payment_status = "failed"
         db.commit()
+        PAYMENTS_VERIFIED.labels("invalid_signature").inc()
         raise HTTPException(status_code=400, detail="Invalid payment signature")
 
+    was_expired = booking.status == "expired"
+
     booking.payment_status = "success"
     booking.razorpay_payment_id = razorpay_payment_id
     booking.razorpay_signature = razorpay_signature
-    db.commit()
 
+    # Paid hold becomes a confirmed booking
+    if booking.status in ("held", "expired"):
+        if was_expired:
+            lock_halls(db, [booking.hall_id])
+        booking.status = "booked"
+        booking.hold_expires_at = None
+
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if not is_overlap_violation(e):
+            raise
+
+        # Hold expired and the slot was taken meanwhile: keep the payment record
+        booking.payment_status = "success"
+        booking.razorpay_payment_id = razorpay_payment_id
+        booking.razorpay_signature = razorpay_signature
+        db.commit()
+        PAYMENTS_VERIFIED.labels("slot_taken").inc()
+        raise HTTPException(
+            status_code=409,
+            detail="Payment received but the hold expired and the slot was taken"
+        )
+
+    if was_expired:
+        booking_index.add(booking.hall_id, booking.id, booking.starts_at, booking.ends_at)
+
+    PAYMENTS_VERIFIED.labels("success").inc()
     return {"message": "Payment verified successfully"}
 
 
@@ -226,7 +490,7 @@ def verify_payment(
 #                          MY BOOKINGS
 # =====================================================================
 @router.get("/my", response_model=list[BookingOut])
-def my_bookings(token: str, db: Session = Depends(get_db)):
+def my_bookings(token: str, db: Session = Depends(get_read_db)):
     user, role = resolve_token_user(token, db)
 
     bookings = db.query(Booking).filter(Booking.user_id == user.id).all()
@@ -266,6 +530,9 @@ def cancel_booking(booking_id: int, token: str, db: Session = Depends(get_db)):
     booking.status = "cancelled"
     db.commit()
 
+    booking_index.remove(booking.id)
+    BOOKINGS_CANCELLED.inc()
+
     return {"message": "Booking cancelled successfully"}
 
 
@@ -273,13 +540,18 @@ def cancel_booking(booking_id: int, token: str, db: Session = Depends(get_db)):
 #                ADMIN — HALL BOOKINGS LIST
 # =====================================================================
 @router.get("/admin/hall/{hall_id}", response_model=list[BookingOut])
-def hall_bookings_admin(hall_id: int, token: str, db: Session = Depends(get_db)):
+def hall_bookings_admin(hall_id: int, token: str, db: Session = Depends(get_read_db)):
 
     user, role = resolve_token_user(token, db)
     if role != "admin":
         raise HTTPException(status_code=403, detail="Admins only")
 
-    bookings = db.query(Booking).filter(Booking.hall_id == hall_id).all()
+    bookings = (
+        db.query(Booking)
+        .options(joinedload(Booking.user))
+        .filter(Booking.hall_id == hall_id)
+        .all()
+    )
 
     return [
         BookingOut(
@@ -299,44 +571,192 @@ def hall_bookings_admin(hall_id: int, token: str, db: Session = Depends(get_db))
 
 
 # =====================================================================
-#           ✔ A — AVAILABLE DATES (PER MONTH)
+#                ADMIN — HALL BOOKINGS EXPORT (STREAMED)
 # =====================================================================
+EXPORT_CHUNK_ROWS = 1000
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_COLUMNS = (
+    "id", "hall_id", "start_date", "end_date", "start_time", "end_time",
+    "status", "total_price", "payment_mode", "payment_status",
+    "booked_by_name", "booked_by_email",
+)
+
+
+def export_rows_query(hall_id: int, from_date: date | None, to_date: date | None, status: str | None):
+    query = (
+        select(
+            Booking.id,
+            Booking.hall_id,
+            Booking.start_date,
+            Booking.end_date,
+            Booking.start_time,
+            Booking.end_time,
+            Booking.status,
+            Booking.total_price,
+            Booking.payment_mode,
+            Booking.payment_status,
+            User.name.label("booked_by_name"),
+            User.email.label("booked_by_email"),
+        )
+        .outerjoin(User, User.id == Booking.user_id)
+        .where(Booking.hall_id == hall_id)
+    )
+
+    # Bookings overlapping [from_date, to_date]
+    if from_date:
+        query = query.where(Booking.end_date >= from_date)
+    if to_date:
+        query = query.where(Booking.start_date <= to_date)
+    if status:
+        query = query.where(Booking.status == status)
+
+    # Server-side cursor, fetched EXPORT_CHUNK_ROWS at a time
+    return query.order_by(Booking.id).execution_options(yield_per=EXPORT_CHUNK_ROWS)
+
+
+def export_value(value):
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    return value
+
+
+async def stream_export(session_factory, query, fmt: str):
+    # Own session: the request-scoped one is closed before the body streams
+    async with session_factory() as db:
+        result = await db.stream(query)
+
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_COLUMNS)
+
+        async for rows in result.partitions():
+            if fmt == "csv":
+                writer.writerows([export_value(v) for v in r] for r in rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            else:
+                yield "".join(
+                    json.dumps({c: export_value(v) for c, v in zip(EXPORT_COLUMNS, r)}) + "\n"
+                    for r in rows
+                )
+
+        if fmt == "csv" and buffer.tell():
+            yield buffer.getvalue()
+
+
+@router.get("/admin/hall/{hall_id}/export")
+async def export_hall_bookings_admin(
+    request: Request,
+    hall_id: int,
+    fmt: str = Query("ndjson", alias="format"),
+    from_date: date | None = None,
+    to_date: date | None = None,
+    status: str | None = None,
+    admin: Principal = Depends(require_admin),
+):
+
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+
+    if from_date and to_date and to_date < from_date:
+        raise HTTPException(status_code=400, detail="to_date cannot be before from_date")
+
+    media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+
+    return StreamingResponse(
+        stream_export(
+            await async_read_sessionmaker(request),
+            export_rows_query(hall_id, from_date, to_date, status),
+            fmt,
+        ),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="hall_{hall_id}_bookings.{fmt}"'
+        },
+    )
+
+
+# =====================================================================
+#           ✔ A — AVAILABLE DATES (PER MONTH / MONTH RANGE)
+# =====================================================================
+MAX_MONTHS_PER_REQUEST = 24
+
+
 @router.get("/hall/{hall_id}/available-dates")
-def available_dates(hall_id: int, month: str, db: Session = Depends(get_db)):
+async def available_dates(
+    hall_id: int,
+    month: str | None = None,
+    from_month: str | None = Query(None, alias="from"),
+    to_month: str | None = Query(None, alias="to"),
+    db: AsyncSession = Depends(get_async_read_db),
+):
 
-    try:
-        year, month_num = map(int, month.split("-"))
-        start_date = date(year, month_num, 1)
-        end_date = (date(year + month_num // 12, (month_num % 12) + 1, 1)
-                    - timedelta(days=1))
-    except:
-        raise HTTPException(status_code=400, detail="Invalid month format (YYYY-MM)")
+    if month:
+        first_month = last_month = month
+    elif from_month and to_month:
+        first_month, last_month = from_month, to_month
+    else:
+        raise HTTPException(status_code=400, detail="Provide month or from/to (YYYY-MM)")
 
-    bookings = db.query(Booking).filter(
-        Booking.hall_id == hall_id,
-        Booking.status == "booked",
-        Booking.start_date <= end_date,
-        Booking.end_date >= start_date
-    ).all()
+    start_date, _ = parse_month(first_month)
+    last_start, end_date = parse_month(last_month)
 
-    booked = set()
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="'to' month cannot be before 'from' month")
 
-    for b in bookings:
-        d = max(b.start_date, start_date)
-        last = min(b.end_date, end_date)
-        while d <= last:
-            booked.add(d)
-            d += timedelta(days=1)
+    month_count = (last_start.year - start_date.year) * 12 + last_start.month - start_date.month + 1
+    if month_count > MAX_MONTHS_PER_REQUEST:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_MONTHS_PER_REQUEST} months per request"
+        )
 
-    all_days = [start_date + timedelta(days=i)
-                for i in range((end_date - start_date).days + 1)]
+    range_period = period_range(
+        datetime.combine(start_date, time(0, 0)),
+        datetime.combine(end_date + timedelta(days=1), time(0, 0)),
+    )
 
-    available = [d.isoformat() for d in all_days if d not in booked]
+    bookings = (await db.execute(
+        select(Booking.start_date, Booking.end_date).filter(
+            Booking.hall_id == hall_id,
+            Booking.status.in_(ACTIVE_STATUSES),
+            Booking.period.overlaps(range_period)
+        )
+    )).all()
+
+    # One bit per day of the whole range, set = booked
+    booked = day_bitmap(bookings, start_date, end_date)
+
+    months = []
+    month_start = start_date
+    while month_start <= end_date:
+        month_end = month_start + timedelta(days=monthrange(month_start.year, month_start.month)[1] - 1)
+        lo = (month_start - start_date).days
+        hi = (month_end - start_date).days
+
+        months.append({
+            "month": month_start.strftime("%Y-%m"),
+            "available_dates": [
+                (start_date + timedelta(days=i)).isoformat()
+                for i in free_day_offsets(booked, lo, hi)
+            ],
+        })
+        month_start = month_end + timedelta(days=1)
+
+    if month:
+        return {
+            "hall_id": hall_id,
+            "month": month,
+            "available_dates": months[0]["available_dates"]
+        }
 
     return {
         "hall_id": hall_id,
-        "month": month,
-        "available_dates": available
+        "from": from_month,
+        "to": to_month,
+        "months": months
     }
 
 
@@ -344,19 +764,23 @@ def available_dates(hall_id: int, month: str, db: Session = Depends(get_db)):
 #           ✔ B — AVAILABLE TIME SLOTS (PER DATE)
 # =====================================================================
 @router.get("/hall/{hall_id}/available-slots")
-def available_slots(hall_id: int, date_str: str, db: Session = Depends(get_db)):
+async def available_slots(hall_id: int, date_str: str, db: AsyncSession = Depends(get_async_read_db)):
 
     try:
         target_date = date.fromisoformat(date_str)
     except:
         raise HTTPException(status_code=400, detail="Invalid date format (YYYY-MM-DD)")
 
-    bookings = db.query(Booking).filter(
-        Booking.hall_id == hall_id,
-        Booking.status == "booked",
-        Booking.start_date <= target_date,
-        Booking.end_date >= target_date,
-    ).all()
+    day_start = datetime.combine(target_date, time(0, 0))
+    day_end = day_start + timedelta(days=1)
+
+    bookings = (await db.execute(
+        select(Booking.start_date, Booking.start_time, Booking.end_date, Booking.end_time).filter(
+            Booking.hall_id == hall_id,
+            Booking.status.in_(ACTIVE_STATUSES),
+            Booking.period.overlaps(period_range(day_start, day_end)),
+        )
+    )).all()
 
     # No bookings → full day available
     if not bookings:
@@ -366,22 +790,29 @@ def available_slots(hall_id: int, date_str: str, db: Session = Depends(get_db)):
             "available_slots": [{"start": "00:00", "end": "23:59"}]
         }
 
-    bookings.sort(key=lambda b: b.start_time)
+    # Clip every booking to this day (handles bookings spanning midnight)
+    busy = sorted(
+        (
+            max(datetime.combine(b.start_date, b.start_time), day_start),
+            min(datetime.combine(b.end_date, b.end_time), day_end),
+        )
+        for b in bookings
+    )
     slots = []
 
-    current = time(0, 0)
+    current = day_start
 
-    for b in bookings:
-        if b.start_time > current:
+    for busy_start, busy_end in busy:
+        if busy_start > current:
             slots.append({
-                "start": current.isoformat(timespec="minutes"),
-                "end": b.start_time.isoformat(timespec="minutes"),
+                "start": current.time().isoformat(timespec="minutes"),
+                "end": busy_start.time().isoformat(timespec="minutes"),
             })
-        current = max(current, b.end_time)
+        current = max(current, busy_end)
 
-    if current < time(23, 59):
+    if current < day_end - timedelta(minutes=1):
         slots.append({
-            "start": current.isoformat(timespec="minutes"),
+            "start": current.time().isoformat(timespec="minutes"),
             "end": "23:59",
         })
 
@@ -393,39 +824,157 @@ def available_slots(hall_id: int, date_str: str, db: Session = Depends(get_db)):
 
 
 # =====================================================================
-#        ✔ D — MULTI-HALL CALENDAR (MONTH VIEW)
+#           ✔ C — FREE SLOTS (DATE RANGE, FIXED GRANULARITY)
 # =====================================================================
-@router.get("/calendar")
-def multi_hall_calendar(month: str, db: Session = Depends(get_db)):
+SLOT_GRANULARITIES = (15, 30, 60)
+MAX_SLOT_RANGE_DAYS = 31
+
+
+@router.get("/hall/{hall_id}/free-slots")
+async def free_slots(
+    hall_id: int,
+    start_date: date,
+    end_date: date,
+    granularity: int = 30,
+    min_duration: int = 0,
+    db: AsyncSession = Depends(get_async_read_db),
+):
 
-    try:
-        year, month_num = map(int, month.split("-"))
-        start_date = date(year, month_num, 1)
-        end_date = (date(year + month_num // 12, (month_num % 12) + 1, 1)
-                    - timedelta(days=1))
-    except:
-        raise HTTPException(status_code=400, detail="Invalid month format (YYYY-MM)")
+    if granularity not in SLOT_GRANULARITIES:
+        raise HTTPException(status_code=400, detail="Granularity must be 15, 30 or 60 minutes")
 
-    halls = db.query(Hall).filter(Hall.deleted == False).all()
-    hall_booked_map = {h.id: [] for h in halls}
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="End date cannot be before start date")
+
+    days = (end_date - start_date).days + 1
+    if days > MAX_SLOT_RANGE_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_SLOT_RANGE_DAYS} days per request"
+        )
 
-    bookings = db.query(Booking).filter(
-        Booking.status == "booked",
-        Booking.start_date <= end_date,
-        Booking.end_date >= start_date
-    ).all()
+    range_start = datetime.combine(start_date, time(0, 0))
+    range_end = range_start + timedelta(days=days)
+
+    bookings = (await db.execute(
+        select(Booking.start_date, Booking.start_time, Booking.end_date, Booking.end_time).filter(
+            Booking.hall_id == hall_id,
+            Booking.status.in_(ACTIVE_STATUSES),
+            Booking.period.overlaps(period_range(range_start, range_end)),
+        )
+    )).all()
+
+    busy = busy_bins(
+        (
+            (datetime.combine(b.start_date, b.start_time), datetime.combine(b.end_date, b.end_time))
+            for b in bookings
+        ),
+        range_start,
+        granularity,
+        days * 24 * 60 // granularity,
+    )
 
-    for b in bookings:
-        d = max(b.start_date, start_date)
-        last = min(b.end_date, end_date)
-        while d <= last:
-            hall_booked_map[b.hall_id].append(d.isoformat())
-            d += timedelta(days=1)
+    min_bins = max(1, -(-min_duration // granularity))
+    step = timedelta(minutes=granularity)
 
     return {
-        "month": month,
-        "halls": [
-            {"hall_id": hid, "booked_dates": sorted(list(set(days)))}
-            for hid, days in hall_booked_map.items()
+        "hall_id": hall_id,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "granularity": granularity,
+        "free_slots": [
+            {
+                "start": (range_start + lo * step).isoformat(timespec="minutes"),
+                "end": (range_start + hi * step).isoformat(timespec="minutes"),
+            }
+            for lo, hi in free_runs(busy, min_bins)
         ]
     }
+
+
+# =====================================================================
+#        ✔ D — MULTI-HALL CALENDAR (MONTH VIEW)
+# =====================================================================
+CALENDAR_SQL = """
+    SELECT h.id AS hall_id,
+           COALESCE(
+               array_agg(DISTINCT CAST(d.day AS date) ORDER BY CAST(d.day AS date))
+                   FILTER (WHERE d.day IS NOT NULL),
+               CAST(ARRAY[] AS date[])
+           ) AS booked_dates
+    FROM halls h
+    LEFT JOIN bookings b
+           ON b.hall_id = h.id
+          AND b.status IN ('booked', 'held')
+          AND b.period && tsrange(:range_start, :range_end, '[)')
+    LEFT JOIN LATERAL generate_series(
+               GREATEST(b.start_date, CAST(:start_date AS date)),
+               LEAST(b.end_date, CAST(:end_date AS date)),
+               interval '1 day'
+           ) AS d(day) ON b.id IS NOT NULL
+    WHERE h.deleted = false
+      {filters}
+    GROUP BY h.id
+    ORDER BY h.id
+"""
+
+CALENDAR_CHUNK_ROWS = 200
+
+
+async def stream_calendar(session_factory, month: str, params: dict, filters: str):
+    # Own session: the request-scoped one is closed before the body streams
+    async with session_factory() as db:
+        result = await db.stream(text(CALENDAR_SQL.format(filters=filters)), params)
+
+        yield '{"month": %s, "halls": [' % json.dumps(month)
+
+        first = True
+        async for rows in result.partitions(CALENDAR_CHUNK_ROWS):
+            chunk = ",".join(
+                json.dumps({
+                    "hall_id": r.hall_id,
+                    "booked_dates": [d.isoformat() for d in r.booked_dates],
+                })
+                for r in rows
+            )
+            yield chunk if first else "," + chunk
+            first = False
+
+        yield "]}"
+
+
+@router.get("/calendar")
+async def multi_hall_calendar(
+    request: Request,
+    month: str,
+    hall_ids: list[int] | None = Query(None),
+    location: str | None = None,
+):
+
+    start_date, end_date = parse_month(month)
+
+    params = {
+        "start_date": start_date,
+        "end_date": end_date,
+        "range_start": datetime.combine(start_date, time(0, 0)),
+        "range_end": datetime.combine(end_date + timedelta(days=1), time(0, 0)),
+    }
+    filters = []
+
+    if hall_ids:
+        filters.append("AND h.id = ANY(:hall_ids)")
+        params["hall_ids"] = hall_ids
+
+    if location:
+        filters.append("AND h.location ILIKE :location")
+        params["location"] = f"%{location}%"
+
+    return StreamingResponse(
+        stream_calendar(
+            await async_read_sessionmaker(request),
+            month,
+            params,
+            "\n      ".join(filters),
+        ),
+        media_type="application/json",
+    )
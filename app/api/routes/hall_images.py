@@ -1,11 +1,11 @@
 from fastapi import APIRouter, File, UploadFile, Depends, HTTPException, Form
 from sqlalchemy.orm import Session
-from jose import jwt
-import os
 from PIL import Image
 import io
 
-from app.db.session import SessionLocal
+from app.db.session import get_db
+from app.db.routing import get_read_db
+from app.core.auth_utils import decode_token
 from app.models.hall import Hall
 from app.models.hall_image import HallImage
 from app.utils.cloudinary_utils import upload_image, delete_image
@@ -13,28 +13,12 @@ from app.utils.cloudinary_utils import upload_image, delete_image
 router = APIRouter(prefix="/hall-images", tags=["Hall Images"])
 
 
-# ---------------- DB SESSION ----------------
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 # ---------------- ADMIN TOKEN VALIDATION ----------------
 def get_current_admin(token: str):
-    try:
-        payload = jwt.decode(
-            token,
-            os.getenv("JWT_SECRET"),
-            algorithms=[os.getenv("JWT_ALGORITHM")]
-        )
-        if payload.get("role") != "admin":
-            raise HTTPException(status_code=401, detail="Admins only")
-        return payload.get("sub")
-    except Exception:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    payload = decode_token(token)
+    if payload["role"] != "admin":
+        raise HTTPException(status_code=401, detail="Admins only")
+    return payload["sub"]
 
 
 # =====================================================================
@@ -141,7 +125,7 @@ async def upload_hall_image(
 #                       LIST IMAGES FOR A HALL
 # =====================================================================
 @router.get("/{hall_id}")
-def list_hall_images(hall_id: int, db: Session = Depends(get_db)):
+def list_hall_images(hall_id: int, db: Session = Depends(get_read_db)):
     hall = db.query(Hall).filter(
         Hall.id == hall_id,
         Hall.deleted == False
@@ -1,23 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from app.db.session import SessionLocal
+from fastapi import APIRouter, Depends, HTTPException, Response
+from datetime import datetime
+import base64
+import json
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from app.db.session import get_db
+from app.db.routing import get_async_read_db
 from app.models.hall import Hall
 from app.models.hall_amenities import HallAmenity
 from app.models.amenities import Amenity
 from app.schemas.hall import HallCreate, HallOut
-from app.models.hall_image import HallImage
+from app.models.booking import Booking, ACTIVE_STATUSES
 from app.core.auth_utils import decode_token
+from app.utils.availability import period_range, has_timezone
 
 router = APIRouter(prefix="/halls", tags=["Halls"])
 
 
-# ---------------- DB SESSION ----------------
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# ---------------- LISTING FILTERS ----------------
+def filter_halls(query, location, min_capacity, max_capacity):
+    if location:
+        query = query.filter(Hall.location.ilike(f"%{location}%"))
+
+    if min_capacity:
+        query = query.filter(Hall.capacity >= min_capacity)
+
+    if max_capacity:
+        query = query.filter(Hall.capacity <= max_capacity)
+
+    return query
 
 
 # ---------------- ADMIN VALIDATION ----------------
@@ -93,6 +105,20 @@ def edit_hall(hall_id: int, data: HallCreate, token: str, db: Session = Depends(
     hall.address = data.address
     hall.location = data.location
 
+    pricing = (
+        data.price_per_hour,
+        data.price_per_day,
+        data.weekend_price_multiplier,
+        data.security_deposit,
+    )
+    if pricing != (
+        hall.price_per_hour,
+        hall.price_per_day,
+        hall.weekend_price_multiplier,
+        hall.security_deposit,
+    ):
+        hall.pricing_version = Hall.pricing_version + 1  # invalidates cached quotes
+
     hall.price_per_hour = data.price_per_hour
     hall.price_per_day = data.price_per_day
     hall.weekend_price_multiplier = data.weekend_price_multiplier
@@ -138,48 +164,145 @@ def delete_hall(hall_id: int, token: str, db: Session = Depends(get_db)):
 # =====================================================================
 #                           LIST HALLS
 # =====================================================================
+HALL_SORT_KEYS = {
+    "id": Hall.id,
+    "capacity": Hall.capacity,
+    "price_per_hour": Hall.price_per_hour,
+}
+
+# JSON types a cursor's sort value may have, per sort key
+CURSOR_VALUE_TYPES = {
+    "id": (int,),
+    "capacity": (int,),
+    "price_per_hour": (int, float),
+}
+
+
+def encode_cursor(sort: str, hall: Hall) -> str:
+    value = getattr(hall, sort)
+    raw = json.dumps([sort, value, hall.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, value, hall_id = json.loads(raw)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if cursor_sort != sort:
+        raise HTTPException(status_code=400, detail="Cursor does not match sort")
+
+    # bool is an int subclass, but true/false is never a valid cursor value;
+    # ints must also fit the INTEGER columns they are compared with
+    def valid(v, types):
+        if isinstance(v, bool) or not isinstance(v, types):
+            return False
+        return not isinstance(v, int) or -2**31 <= v < 2**31
+
+    if not valid(hall_id, (int,)) or not valid(value, CURSOR_VALUE_TYPES[sort]):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return value, hall_id
+
+
 @router.get("/", response_model=list[HallOut])
-def list_halls(
-    db: Session = Depends(get_db),
+async def list_halls(
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
     page: int = 1,
     limit: int = 10,
+    after: str | None = None,
+    sort: str = "id",
     location: str | None = None,
     min_capacity: int | None = None,
     max_capacity: int | None = None,
 ):
-    query = db.query(Hall).options(joinedload(Hall.amenities)).filter(Hall.deleted == False)
+    """
+    Keyset pagination: pass the X-Next-Cursor header of the previous
+    response as `after`. `page` (offset based) is kept for older clients.
+    """
+    sort_col = HALL_SORT_KEYS.get(sort)
+    if sort_col is None:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(HALL_SORT_KEYS)}")
+
+    query = select(Hall).options(selectinload(Hall.amenities)).filter(Hall.deleted == False)
+    query = filter_halls(query, location, min_capacity, max_capacity)
+
+    if sort == "id":
+        query = query.order_by(Hall.id)
+    else:
+        query = query.order_by(sort_col, Hall.id)
+
+    if after:
+        value, hall_id = decode_cursor(after, sort)
+        if sort == "id":
+            query = query.filter(Hall.id > hall_id)
+        else:
+            query = query.filter(tuple_(sort_col, Hall.id) > tuple_(value, hall_id))
+    else:
+        query = query.offset((page - 1) * limit)
+
+    # One extra row tells whether another page exists
+    result = await db.execute(query.limit(limit + 1))
+    halls = result.scalars().all()
+
+    if len(halls) > limit:
+        halls = halls[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(sort, halls[-1])
 
-    if location:
-        query = query.filter(Hall.location.ilike(f"%{location}%"))
+    return halls
 
-    if min_capacity:
-        query = query.filter(Hall.capacity >= min_capacity)
 
-    if max_capacity:
-        query = query.filter(Hall.capacity <= max_capacity)
+# =====================================================================
+#                   SEARCH HALLS FREE FOR A TIME WINDOW
+# =====================================================================
+@router.get("/available", response_model=list[HallOut])
+async def search_available_halls(
+    start: datetime,
+    end: datetime,
+    db: AsyncSession = Depends(get_async_read_db),
+    page: int = 1,
+    limit: int = 10,
+    location: str | None = None,
+    min_capacity: int | None = None,
+    max_capacity: int | None = None,
+):
+    if has_timezone(start, end):
+        raise HTTPException(status_code=400, detail="start and end must be local times without a UTC offset")
 
-    halls = query.offset((page - 1) * limit).limit(limit).all()
+    if end <= start:
+        raise HTTPException(status_code=400, detail="End must be after start")
 
-    return halls
+    # Anti-join: no active booking of the hall overlaps the window
+    busy = select(Booking.id).filter(
+        Booking.hall_id == Hall.id,
+        Booking.status.in_(ACTIVE_STATUSES),
+        Booking.period.overlaps(period_range(start, end)),
+    ).exists()
+
+    query = select(Hall).options(selectinload(Hall.amenities)).filter(Hall.deleted == False, ~busy)
+    query = filter_halls(query, location, min_capacity, max_capacity)
+
+    result = await db.execute(query.order_by(Hall.id).offset((page - 1) * limit).limit(limit))
+
+    return result.scalars().all()
 
 
 # =====================================================================
 #                           HALL DETAILS
 # =====================================================================
 @router.get("/{hall_id}", response_model=HallOut)
-def get_hall(hall_id: int, db: Session = Depends(get_db)):
-    hall = (
-        db.query(Hall)
+async def get_hall(hall_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    result = await db.execute(
+        select(Hall)
+        .options(selectinload(Hall.amenities))
         .filter(Hall.id == hall_id, Hall.deleted == False)
-        .first()
     )
+    hall = result.scalars().first()
 
     if not hall:
         raise HTTPException(status_code=404, detail="Hall not found")
 
-    images = db.query(HallImage).filter(HallImage.hall_id == hall_id).all()
-
-    hall.images = images  # inject into HallOut serializer
-
     return hall
-
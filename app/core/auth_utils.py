@@ -1,19 +1,85 @@
 from jose import jwt, JWTError
 from fastapi import HTTPException
+from hashlib import sha256
+from heapq import heappush, heappop
+from threading import Lock
 import os
+import time
 
-def decode_token(token: str):
-    try:
-        payload = jwt.decode(
-            token,
-            os.getenv("JWT_SECRET"),
-            algorithms=[os.getenv("JWT_ALGORITHM")]
-        )
+from app.core.jwt import SECRET_KEY, ALGORITHM
+
+
+# =====================================================================
+#                      VERIFIED TOKEN CACHE
+# =====================================================================
+class VerifiedTokenCache:
+    """
+    Payloads of tokens that already passed signature verification, keyed by
+    sha256(token) and kept until the token's own exp.
+
+    Lookups are a single dict read (no lock); only inserts and evictions
+    take the lock. Expired entries are dropped by exp order on insert, and
+    the oldest entry goes when the cache is still full.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = {}   # digest -> (payload, exp)
+        self._expiry = []    # heap of (exp, digest)
+        self._lock = Lock()
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return sha256(token.encode()).digest()
+
+    def get(self, token: str):
+        entry = self._entries.get(self._digest(token))
+        if entry is None or entry[1] <= time.time():
+            return None
+        return entry[0]
+
+    def put(self, token: str, payload: dict):
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)) or self.maxsize <= 0:
+            return
+
+        digest = self._digest(token)
+        now = time.time()
 
-        if "sub" not in payload or "role" not in payload:
-            raise HTTPException(status_code=401, detail="Invalid token payload")
+        with self._lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                _, expired = heappop(self._expiry)
+                entry = self._entries.get(expired)
+                if entry is not None and entry[1] <= now:
+                    del self._entries[expired]
 
+            if digest not in self._entries and len(self._entries) >= self.maxsize:
+                del self._entries[next(iter(self._entries))]
+
+            self._entries[digest] = (payload, exp)
+            heappush(self._expiry, (exp, digest))
+
+            # Heap entries for tokens evicted early are only cleared at their exp
+            if len(self._expiry) > 2 * self.maxsize:
+                self._expiry = [(e, d) for d, (_, e) in self._entries.items()]
+                self._expiry.sort()
+
+
+token_cache = VerifiedTokenCache(int(os.getenv("TOKEN_CACHE_SIZE", 10000)))
+
+
+def decode_token(token: str):
+    payload = token_cache.get(token)
+    if payload is not None:
         return payload
 
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    if "sub" not in payload or "role" not in payload:
+        raise HTTPException(status_code=401, detail="Invalid token payload")
+
+    token_cache.put(token, payload)
+    return payload
@@ -0,0 +1,24 @@
+from passlib.context import CryptContext
+from time import perf_counter
+import os
+
+# Kept free of app imports: hashing pool workers (spawned) import only this module.
+
+# bcrypt cost factor; raising it makes older hashes "deprecated" so they are
+# transparently re-hashed on the next successful login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+# ---------- RUN INSIDE POOL WORKERS ----------
+# Each returns (result, seconds spent hashing) so the caller can tell queue
+# wait apart from bcrypt time.
+def hash_in_worker(password: str):
+    started = perf_counter()
+    return pwd_context.hash(password), perf_counter() - started
+
+
+def verify_and_update_in_worker(password: str, hashed: str):
+    started = perf_counter()
+    return pwd_context.verify_and_update(password, hashed), perf_counter() - started
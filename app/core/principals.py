@@ -0,0 +1,105 @@
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from threading import Lock
+from typing import NamedTuple
+import os
+import time
+
+from app.models.user import User
+from app.models.admin import Admin
+
+
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 300))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", 10000))
+
+ACCOUNT_MODELS = {"user": User, "admin": Admin}
+
+
+class Principal(NamedTuple):
+    """Who a token belongs to — enough for auth checks and booking records"""
+    id: int
+    name: str
+    email: str
+    role: str
+
+
+# =====================================================================
+#                         PRINCIPAL CACHE (TTL)
+# =====================================================================
+class PrincipalCache:
+    """
+    (role, account id) -> Principal for PRINCIPAL_CACHE_TTL_SECONDS.
+
+    Account updates and deletes made through the ORM drop the entry in this
+    process; the TTL bounds how long other workers can serve a stale one.
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = {}   # (role, id) -> (principal, expires_at)
+        self._lock = Lock()
+
+    def get(self, role: str, account_id: int):
+        entry = self._entries.get((role, account_id))
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        return entry[0]
+
+    def put(self, principal: Principal):
+        if self.maxsize <= 0:
+            return
+
+        key = (principal.role, principal.id)
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.maxsize:
+                del self._entries[next(iter(self._entries))]
+            self._entries[key] = (principal, time.monotonic() + self.ttl)
+
+    def invalidate(self, role: str, account_id: int):
+        with self._lock:
+            self._entries.pop((role, account_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+def load_principal(payload: dict, db: Session) -> Principal:
+    role = payload["role"]
+    model = ACCOUNT_MODELS.get(role)
+    if model is None:
+        raise HTTPException(status_code=401, detail="Invalid role")
+
+    account_id = payload.get("uid")
+    if account_id is not None:
+        principal = principal_cache.get(role, account_id)
+        if principal is not None:
+            return principal
+        account = db.query(model).filter(model.id == account_id).first()
+    else:
+        # Tokens issued before the uid claim only carry the email
+        account = db.query(model).filter(model.email == payload["sub"]).first()
+
+    if not account:
+        raise HTTPException(status_code=404, detail=f"{role.capitalize()} not found")
+
+    principal = Principal(account.id, account.name, account.email, role)
+    principal_cache.put(principal)
+    return principal
+
+
+# ---------------- INVALIDATION ON ACCOUNT CHANGES ----------------
+def _invalidate_on_change(role: str):
+    def listener(mapper, connection, target):
+        principal_cache.invalidate(role, target.id)
+    return listener
+
+
+for _role, _model in ACCOUNT_MODELS.items():
+    event.listen(_model, "after_update", _invalidate_on_change(_role))
+    event.listen(_model, "after_delete", _invalidate_on_change(_role))
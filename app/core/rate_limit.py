@@ -0,0 +1,142 @@
+from collections import OrderedDict
+from fastapi import HTTPException, Request
+from threading import Lock
+import ipaddress
+import math
+import os
+import time
+
+from app.core.security import hash_queue_full
+from app.utils.metrics import AUTH_THROTTLED
+
+
+# Sustained attempts per minute and burst size, per client IP and per account.
+# Behind a reverse proxy (Render) the socket peer is the proxy, so the client IP
+# is taken from X-Forwarded-For, but only through hops listed in TRUSTED_PROXIES:
+#   "*"            the direct peer is a proxy; use the right-most forwarded address
+#   "10.0.0.0/8,…" skip trusted addresses from the right; first untrusted is the client
+#   unset          no proxy; use the socket peer (otherwise every client shares one bucket)
+TRUSTED_PROXIES = os.getenv("TRUSTED_PROXIES", "").strip()
+AUTH_IP_PER_MINUTE = float(os.getenv("AUTH_IP_PER_MINUTE", 20))
+AUTH_IP_BURST = int(os.getenv("AUTH_IP_BURST", 10))
+AUTH_ACCOUNT_PER_MINUTE = float(os.getenv("AUTH_ACCOUNT_PER_MINUTE", 5))
+AUTH_ACCOUNT_BURST = int(os.getenv("AUTH_ACCOUNT_BURST", 5))
+
+# Shed all auth attempts while 1-minute load per CPU is above this (0 = off)
+AUTH_SHED_LOAD_PER_CPU = float(os.getenv("AUTH_SHED_LOAD_PER_CPU", 0))
+
+
+# =====================================================================
+#                        TOKEN BUCKET LIMITER
+# =====================================================================
+class TokenBucketLimiter:
+    """
+    key -> (tokens, last refill) refilled at `per_minute`, capped at `burst`.
+
+    Buckets live in an OrderedDict in last-touched order, so buckets idle
+    long enough to be full again are evicted from the front as new
+    requests arrive: O(1) amortized per call, no background sweep.
+    """
+
+    def __init__(self, per_minute: float, burst: int):
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.idle_seconds = burst / self.rate if self.rate > 0 else math.inf
+        self._buckets = OrderedDict()
+        self._lock = Lock()
+
+    def acquire(self, key: str) -> float:
+        """Take one token; returns 0 if allowed, else seconds until one is available"""
+        now = time.monotonic()
+
+        with self._lock:
+            self._evict_idle(now)
+
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return 0.0
+
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / self.rate if self.rate > 0 else math.inf
+
+    def _evict_idle(self, now: float):
+        while self._buckets:
+            key, (_, updated) = next(iter(self._buckets.items()))
+            if now - updated < self.idle_seconds:
+                break
+            del self._buckets[key]
+
+
+# =====================================================================
+#                     CLIENT IP (TRUSTED PROXIES)
+# =====================================================================
+_trusted_networks = [
+    ipaddress.ip_network(p.strip(), strict=False)
+    for p in TRUSTED_PROXIES.split(",")
+    if p.strip() and p.strip() != "*"
+]
+
+
+def _is_trusted(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in _trusted_networks)
+
+
+def client_ip(request: Request) -> str:
+    peer = request.client.host if request.client else "unknown"
+    if not TRUSTED_PROXIES or (TRUSTED_PROXIES != "*" and not _is_trusted(peer)):
+        return peer
+
+    forwarded = [h.strip() for h in request.headers.get("x-forwarded-for", "").split(",") if h.strip()]
+    if not forwarded:
+        return peer
+    if TRUSTED_PROXIES == "*":
+        return forwarded[-1]
+
+    # Entries left of the first untrusted hop could be forged by the client
+    for address in reversed(forwarded):
+        if not _is_trusted(address):
+            return address
+    return forwarded[0]
+
+
+ip_limiter = TokenBucketLimiter(AUTH_IP_PER_MINUTE, AUTH_IP_BURST)
+account_limiter = TokenBucketLimiter(AUTH_ACCOUNT_PER_MINUTE, AUTH_ACCOUNT_BURST)
+
+
+def _reject(action: str, reason: str, retry_after: float):
+    AUTH_THROTTLED.labels(action, reason).inc()
+    raise HTTPException(
+        status_code=429,
+        detail="Too many attempts, please retry later",
+        headers={"Retry-After": str(max(1, math.ceil(min(retry_after, 3600))))},
+    )
+
+
+def _cpu_saturated() -> bool:
+    if AUTH_SHED_LOAD_PER_CPU <= 0:
+        return False
+    return os.getloadavg()[0] / (os.cpu_count() or 1) > AUTH_SHED_LOAD_PER_CPU
+
+
+# -------- CALL FIRST IN LOGIN/REGISTER HANDLERS (before DB or bcrypt) --------
+def throttle_auth(request: Request, action: str, account: str | None = None):
+    if hash_queue_full():
+        _reject(action, "hash_queue_full", 1)
+    if _cpu_saturated():
+        _reject(action, "cpu", 5)
+
+    wait = ip_limiter.acquire(f"{action}:{client_ip(request)}")
+    if wait:
+        _reject(action, "ip", wait)
+
+    if account:
+        wait = account_limiter.acquire(f"{action}:{account.lower()}")
+        if wait:
+            _reject(action, "account", wait)
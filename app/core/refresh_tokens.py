@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from hashlib import sha256
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from uuid import uuid4
+import asyncio
+import os
+import secrets
+
+from app.db.session import SessionLocal
+from app.models.refresh_token import RefreshToken
+
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 30))
+
+# Revoked rows are kept this long so a replayed (already rotated) token is
+# still recognised and revokes its family; after that they are purged
+REFRESH_TOKEN_PURGE_GRACE_HOURS = int(os.getenv("REFRESH_TOKEN_PURGE_GRACE_HOURS", 168))
+REFRESH_TOKEN_PURGE_BATCH = int(os.getenv("REFRESH_TOKEN_PURGE_BATCH", 1000))
+REFRESH_TOKEN_PURGE_SECONDS = int(os.getenv("REFRESH_TOKEN_PURGE_SECONDS", 3600))
+
+PURGE_REFRESH_TOKENS_SQL = """
+    DELETE FROM refresh_tokens
+    WHERE id IN (
+        SELECT id FROM refresh_tokens
+        WHERE expires_at < :now
+           OR revoked_at < :revoked_before
+        LIMIT :batch
+        FOR UPDATE SKIP LOCKED
+    )
+"""
+
+
+def hash_refresh_token(token: str) -> str:
+    # Tokens are 256 random bits, so a plain sha256 is enough (no bcrypt needed)
+    return sha256(token.encode()).hexdigest()
+
+
+# -------- ISSUE (caller commits) --------
+def issue_refresh_token(db: Session, role: str, account_id: int, family_id: str | None = None):
+    """Create a refresh token row and return the raw token (shown to the client once)"""
+    token = secrets.token_urlsafe(32)
+    now = datetime.utcnow()
+
+    db.add(RefreshToken(
+        token_hash=hash_refresh_token(token),
+        family_id=family_id or uuid4().hex,
+        role=role,
+        account_id=account_id,
+        created_at=now,
+        expires_at=now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
+
+# -------- REVOKE (caller commits) --------
+def revoke_family(db: Session, family_id: str):
+    db.query(RefreshToken).filter(
+        RefreshToken.family_id == family_id,
+        RefreshToken.revoked_at.is_(None),
+    ).update({"revoked_at": datetime.utcnow()}, synchronize_session=False)
+
+
+def find_refresh_token(db: Session, token: str, for_update: bool = False):
+    query = db.query(RefreshToken).filter(RefreshToken.token_hash == hash_refresh_token(token))
+    if for_update:
+        query = query.with_for_update()
+    return query.first()
+
+
+# -------- ROTATE (caller commits) --------
+def rotate_refresh_token(db: Session, token: str):
+    """
+    Revoke `token` and issue its successor in the same family; returns
+    (old row, new token). Only a detected replay is committed here.
+    """
+    # Row lock: two concurrent refreshes with the same token cannot both rotate it
+    row = find_refresh_token(db, token, for_update=True)
+    if not row:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    if row.revoked_at is not None:
+        # Already rotated or logged out: treat as replay and end the whole session
+        revoke_family(db, row.family_id)
+        db.commit()
+        raise HTTPException(status_code=401, detail="Refresh token reused, session revoked")
+
+    now = datetime.utcnow()
+    if row.expires_at <= now:
+        raise HTTPException(status_code=401, detail="Refresh token expired")
+
+    row.revoked_at = now
+    new_token = issue_refresh_token(db, row.role, row.account_id, row.family_id)
+
+    return row, new_token
+
+
+# -------- PURGE --------
+def purge_refresh_tokens(db: Session, batch: int = REFRESH_TOKEN_PURGE_BATCH):
+    """Delete up to `batch` expired or long-revoked rows, commit, and return how many"""
+    now = datetime.utcnow()
+    result = db.execute(text(PURGE_REFRESH_TOKENS_SQL), {
+        "now": now,
+        "revoked_before": now - timedelta(hours=REFRESH_TOKEN_PURGE_GRACE_HOURS),
+        "batch": batch,
+    })
+    db.commit()
+    return result.rowcount
+
+
+# ---------------- BACKGROUND PURGE ----------------
+def sweep_refresh_tokens():
+    db = SessionLocal()
+    try:
+        while purge_refresh_tokens(db) == REFRESH_TOKEN_PURGE_BATCH:
+            pass
+    finally:
+        db.close()
+
+
+async def run_refresh_token_purger():
+    while True:
+        await asyncio.sleep(REFRESH_TOKEN_PURGE_SECONDS)
+        try:
+            await run_in_threadpool(sweep_refresh_tokens)
+        except Exception as e:
+            print("Refresh token purge error:", e)
@@ -1,58 +1,119 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from fastapi import HTTPException
-from passlib.context import CryptContext
+from multiprocessing import get_context
 from sqlalchemy.orm import Session
-from jose import jwt, JWTError
+from threading import Lock
+from time import perf_counter
 import os
 
-from app.models.user import User
-from app.models.admin import Admin
+from app.core.auth_utils import decode_token
+from app.core.hashing import hash_in_worker, verify_and_update_in_worker
+from app.core.principals import load_principal
+from app.utils.metrics import (
+    PASSWORD_HASH_SECONDS, PASSWORD_HASH_QUEUE_SECONDS, PASSWORD_HASH_PENDING, PASSWORD_HASH_REJECTED
+)
 
-SECRET_KEY = os.getenv("JWT_SECRET")
-ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt runs in separate processes so a login storm cannot starve the
+# request workers; HASH_MAX_PENDING caps jobs queued or running at once
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", os.cpu_count() or 1))
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", HASH_WORKERS * 4))
+
+_hash_pool = None
+_hash_pool_lock = Lock()
+_hash_pending = 0
+_hash_pending_lock = Lock()
+
+
+def hash_pool() -> ProcessPoolExecutor:
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            # spawn: children start clean (no inherited DB connections or threads)
+            _hash_pool = ProcessPoolExecutor(HASH_WORKERS, mp_context=get_context("spawn"))
+        return _hash_pool
+
+
+def shutdown_hash_pool():
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is not None:
+            _hash_pool.shutdown(cancel_futures=True)
+            _hash_pool = None
+
+
+def hash_queue_full() -> bool:
+    return _hash_pending >= HASH_MAX_PENDING
+
+
+def _reserve_hash_slot() -> bool:
+    global _hash_pending
+    with _hash_pending_lock:
+        if _hash_pending >= HASH_MAX_PENDING:
+            return False
+        _hash_pending += 1
+        return True
+
+
+def _release_hash_slot():
+    global _hash_pending
+    with _hash_pending_lock:
+        _hash_pending -= 1
+
+
+def run_hash_job(operation: str, fn, *args):
+    if not _reserve_hash_slot():
+        PASSWORD_HASH_REJECTED.inc()
+        raise HTTPException(
+            status_code=429,
+            detail="Too many sign-ins in progress, please retry",
+            headers={"Retry-After": "1"},
+        )
+
+    PASSWORD_HASH_PENDING.inc()
+    started = perf_counter()
+    try:
+        result, hash_seconds = hash_pool().submit(fn, *args).result()
+    except BrokenProcessPool:
+        shutdown_hash_pool()  # a worker died; the next job starts a fresh pool
+        raise HTTPException(status_code=503, detail="Password hashing unavailable, please retry")
+    finally:
+        PASSWORD_HASH_PENDING.dec()
+        _release_hash_slot()
+
+    PASSWORD_HASH_SECONDS.labels(operation).observe(hash_seconds)
+    PASSWORD_HASH_QUEUE_SECONDS.labels(operation).observe(max(perf_counter() - started - hash_seconds, 0))
+    return result
 
 
 # ---------- PASSWORD ENCRYPTION ----------
 def hash_password(password: str):
-    return pwd_context.hash(password)
+    return run_hash_job("hash", hash_in_worker, password)
 
 
 def verify_password(password: str, hashed: str):
-    return pwd_context.verify(password, hashed)
+    return verify_and_update(password, hashed)[0]
+
+
+def verify_and_update(password: str, hashed: str):
+    """(valid, new_hash) — new_hash is set when the stored hash predates the cost policy"""
+    return run_hash_job("verify", verify_and_update_in_worker, password, hashed)
 
 
 # ---------- GET CURRENT USER ----------
 def get_current_user(token: str, db: Session):
-    """Return logged-in user object from JWT"""
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email = payload.get("sub")
-        if not email:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        user = db.query(User).filter(User.email == email).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        return user
-
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    """Return the logged-in user's Principal from JWT"""
+    payload = decode_token(token)
+    if payload["role"] != "user":
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return load_principal(payload, db)
 
 
 # ---------- GET CURRENT ADMIN ----------
 def get_current_admin(token: str, db: Session):
-    """Return logged-in admin object from JWT"""
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email = payload.get("sub")
-        role = payload.get("role")
-        if role != "admin":
-            raise HTTPException(status_code=401, detail="Admin access only")
-
-        admin = db.query(Admin).filter(Admin.email == email).first()
-        if not admin:
-            raise HTTPException(status_code=404, detail="Admin not found")
-        return admin
-
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    """Return the logged-in admin's Principal from JWT"""
+    payload = decode_token(token)
+    if payload["role"] != "admin":
+        raise HTTPException(status_code=401, detail="Admin access only")
+    return load_principal(payload, db)
@@ -0,0 +1,46 @@
+import os
+import random
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+
+# First key of the two-key advisory lock, so hall locks never collide
+# with advisory locks taken for other purposes
+HALL_LOCK_NAMESPACE = 1001
+
+BOOKING_LOCK_TIMEOUT_MS = int(os.getenv("BOOKING_LOCK_TIMEOUT_MS", 5000))
+BOOKING_WRITE_RETRIES = int(os.getenv("BOOKING_WRITE_RETRIES", 3))
+BOOKING_RETRY_BACKOFF = float(os.getenv("BOOKING_RETRY_BACKOFF", 0.05))
+
+# deadlock_detected, serialization_failure, lock_not_available (lock_timeout)
+RETRYABLE_PGCODES = {"40P01", "40001", "55P03"}
+
+
+def lock_halls(db: Session, hall_ids):
+    """
+    Serialize booking writes per hall for the rest of the transaction.
+    Locks are taken in ascending hall_id order so multi-hall writers
+    cannot deadlock each other; they are released on commit/rollback.
+    """
+    db.execute(text(f"SET LOCAL lock_timeout = {BOOKING_LOCK_TIMEOUT_MS}"))
+    for hall_id in sorted(set(hall_ids)):
+        db.execute(
+            text("SELECT pg_advisory_xact_lock(:ns, :hall_id)"),
+            {"ns": HALL_LOCK_NAMESPACE, "hall_id": hall_id},
+        )
+
+
+def run_with_retries(db: Session, write):
+    """Run write(), retrying with jittered backoff on deadlocks/lock timeouts"""
+    for attempt in range(BOOKING_WRITE_RETRIES):
+        try:
+            return write()
+        except DBAPIError as e:
+            db.rollback()
+            retryable = getattr(e.orig, "pgcode", None) in RETRYABLE_PGCODES
+            if not retryable or attempt == BOOKING_WRITE_RETRIES - 1:
+                raise
+            time.sleep(BOOKING_RETRY_BACKOFF * (2 ** attempt) * (0.5 + random.random()))
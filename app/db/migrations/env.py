@@ -15,6 +15,7 @@ from app.models.user import User
 from app.models.hall import Hall
 from app.models.hall_image import HallImage
 from app.models.booking import Booking
+from app.models.refresh_token import RefreshToken
 from app.db.session import Base
 
 
@@ -0,0 +1,28 @@
+"""add pricing_version to hall
+
+Revision ID: 5e8b07c4a1d9
+Revises: c3f1a9d2e7b4
+Create Date: 2025-12-04 15:22:48.901736
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e8b07c4a1d9'
+down_revision: Union[str, Sequence[str], None] = 'c3f1a9d2e7b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('halls', sa.Column('pricing_version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('halls', 'pricing_version')
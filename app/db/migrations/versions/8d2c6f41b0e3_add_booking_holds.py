@@ -0,0 +1,60 @@
+"""add booking holds for online payments
+
+Revision ID: 8d2c6f41b0e3
+Revises: 5e8b07c4a1d9
+Create Date: 2025-12-06 11:08:33.274190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2c6f41b0e3'
+down_revision: Union[str, Sequence[str], None] = '5e8b07c4a1d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('bookings', sa.Column('hold_expires_at', sa.DateTime(), nullable=True))
+
+    # Holds block the slot exactly like confirmed bookings
+    op.drop_constraint('excl_bookings_hall_period', 'bookings')
+    op.create_exclude_constraint(
+        'excl_bookings_hall_period',
+        'bookings',
+        ('hall_id', '='),
+        ('period', '&&'),
+        where="status IN ('booked', 'held')",
+        using='gist',
+    )
+
+    # Sweeper scans only live holds by expiry
+    op.create_index(
+        'ix_bookings_hold_expiry',
+        'bookings',
+        ['hold_expires_at'],
+        postgresql_where=sa.text("status = 'held'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bookings_hold_expiry', table_name='bookings')
+
+    op.execute("UPDATE bookings SET status = 'expired' WHERE status = 'held'")
+    op.drop_constraint('excl_bookings_hall_period', 'bookings')
+    op.create_exclude_constraint(
+        'excl_bookings_hall_period',
+        'bookings',
+        ('hall_id', '='),
+        ('period', '&&'),
+        where="status = 'booked'",
+        using='gist',
+    )
+
+    op.drop_column('bookings', 'hold_expires_at')
@@ -0,0 +1,77 @@
+"""add booking period tsrange with gist exclusion constraint
+
+Revision ID: c3f1a9d2e7b4
+Revises: 537566340360
+Create Date: 2025-12-02 10:41:07.318524
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSRANGE
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f1a9d2e7b4'
+down_revision: Union[str, Sequence[str], None] = '537566340360'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The old time-of-day overlap check let multi-day overlaps through, so existing
+# data may already violate the constraint (which cannot be added NOT VALID)
+OVERLAPPING_BOOKINGS_SQL = """
+    SELECT a.hall_id, a.id AS first_id, b.id AS second_id
+    FROM bookings a
+    JOIN bookings b
+      ON b.hall_id = a.hall_id
+     AND b.id > a.id
+     AND b.period && a.period
+    WHERE a.status = 'booked' AND b.status = 'booked'
+    ORDER BY a.hall_id, a.id, b.id
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Needed so plain integers (hall_id) can take part in a GiST exclusion
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+
+    # Generated column: existing rows are backfilled by Postgres on add
+    op.add_column('bookings', sa.Column(
+        'period',
+        TSRANGE(),
+        sa.Computed("tsrange(start_date + start_time, end_date + end_time, '[)')", persisted=True),
+        nullable=False,
+    ))
+
+    op.create_index('ix_bookings_period', 'bookings', ['period'], postgresql_using='gist')
+
+    # Abort rather than guess which booking should win; resolve the listed
+    # pairs (e.g. cancel one of each) and re-run the upgrade
+    overlaps = op.get_bind().execute(sa.text(OVERLAPPING_BOOKINGS_SQL)).fetchall()
+    if overlaps:
+        pairs = "\n".join(
+            f"  hall {r.hall_id}: bookings {r.first_id} and {r.second_id}" for r in overlaps
+        )
+        raise RuntimeError(
+            "Cannot add excl_bookings_hall_period: overlapping 'booked' rows exist.\n"
+            f"{pairs}\n"
+            "Cancel or move one booking of each pair, then run the upgrade again."
+        )
+
+    op.create_exclude_constraint(
+        'excl_bookings_hall_period',
+        'bookings',
+        ('hall_id', '='),
+        ('period', '&&'),
+        where="status = 'booked'",
+        using='gist',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('excl_bookings_hall_period', 'bookings')
+    op.drop_index('ix_bookings_period', table_name='bookings')
+    op.drop_column('bookings', 'period')
@@ -0,0 +1,69 @@
+"""add indexes for hot query patterns
+
+Revision ID: f4a7d3c9e215
+Revises: 8d2c6f41b0e3
+Create Date: 2025-12-09 09:47:15.602318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a7d3c9e215'
+down_revision: Union[str, Sequence[str], None] = '8d2c6f41b0e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Substring location search (ILIKE '%...%') in list_halls
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # -------- bookings --------
+    op.create_index('ix_bookings_user_id', 'bookings', ['user_id'])
+    op.create_index('ix_bookings_hall_id_start_date', 'bookings', ['hall_id', 'start_date'])
+    op.create_index(
+        'ix_bookings_active_hall_dates',
+        'bookings',
+        ['hall_id', 'start_date', 'end_date'],
+        postgresql_where=sa.text("status IN ('booked', 'held')"),
+    )
+
+    # -------- hall_images --------
+    op.create_index('ix_hall_images_hall_id', 'hall_images', ['hall_id'])
+
+    # -------- halls --------
+    op.create_index(
+        'ix_halls_active_id',
+        'halls',
+        ['id'],
+        postgresql_where=sa.text("deleted = false"),
+    )
+    op.create_index(
+        'ix_halls_active_capacity',
+        'halls',
+        ['capacity'],
+        postgresql_where=sa.text("deleted = false"),
+    )
+    op.create_index(
+        'ix_halls_location_trgm',
+        'halls',
+        ['location'],
+        postgresql_using='gin',
+        postgresql_ops={'location': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_halls_location_trgm', table_name='halls')
+    op.drop_index('ix_halls_active_capacity', table_name='halls')
+    op.drop_index('ix_halls_active_id', table_name='halls')
+    op.drop_index('ix_hall_images_hall_id', table_name='hall_images')
+    op.drop_index('ix_bookings_active_hall_dates', table_name='bookings')
+    op.drop_index('ix_bookings_hall_id_start_date', table_name='bookings')
+    op.drop_index('ix_bookings_user_id', table_name='bookings')
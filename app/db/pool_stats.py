@@ -0,0 +1,79 @@
+from bisect import bisect_left
+from threading import Lock
+from time import perf_counter
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+
+# Upper bounds (seconds) of the checkout wait-time histogram buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class PoolWaitStats:
+    """Checkout wait-time histogram and timeout counter for the DB pool"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.bucket_counts = [0] * (len(WAIT_BUCKETS) + 1)  # last = +Inf
+        self.wait_count = 0
+        self.wait_sum = 0.0
+        self.timeouts = 0
+
+    def observe_wait(self, seconds: float):
+        with self._lock:
+            self.bucket_counts[bisect_left(WAIT_BUCKETS, seconds)] += 1
+            self.wait_count += 1
+            self.wait_sum += seconds
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool: QueuePool):
+        with self._lock:
+            cumulative, buckets = 0, {}
+            for bound, count in zip(WAIT_BUCKETS + (float("inf"),), self.bucket_counts):
+                cumulative += count
+                buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+
+            return {
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),  # negative until pool_size is exceeded
+                "timeouts": self.timeouts,
+                "wait_seconds": {
+                    "count": self.wait_count,
+                    "sum": round(self.wait_sum, 6),
+                    "buckets": buckets,
+                },
+            }
+
+
+pool_wait_stats = PoolWaitStats()
+async_pool_wait_stats = PoolWaitStats()
+
+
+class _WaitTimingMixin:
+    """Records how long each checkout waited for a connection"""
+
+    wait_stats = None
+
+    def _do_get(self):
+        start = perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.wait_stats.record_timeout()
+            raise
+        finally:
+            self.wait_stats.observe_wait(perf_counter() - start)
+
+
+class InstrumentedQueuePool(_WaitTimingMixin, QueuePool):
+    wait_stats = pool_wait_stats
+
+
+class InstrumentedAsyncQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    wait_stats = async_pool_wait_stats
@@ -0,0 +1,141 @@
+import json
+import logging
+import os
+import random
+from contextvars import ContextVar
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+
+
+# Fraction of requests that get SQL timing (0 disables it, 1 times every request)
+SQL_TIMING_SAMPLE_RATE = float(os.getenv("SQL_TIMING_SAMPLE_RATE", 0.1))
+SLOWEST_STATEMENT_CHARS = 200
+
+access_log = logging.getLogger("app.access")
+if not access_log.handlers:
+    # One JSON object per line on stderr unless logging is configured elsewhere
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    access_log.addHandler(_handler)
+    access_log.setLevel(logging.INFO)
+    access_log.propagate = False
+
+
+class RequestQueryStats:
+    """Query count, DB time and slowest statement for one request"""
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.count = 0
+        self.db_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement = None
+
+    def observe(self, statement: str, seconds: float):
+        self.count += 1
+        self.db_seconds += seconds
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+    def server_timing(self) -> str:
+        total_ms = (perf_counter() - self.started) * 1000
+        return ", ".join([
+            f'db;dur={self.db_seconds * 1000:.2f};desc="{self.count} queries"',
+            f"db-slowest;dur={self.slowest_seconds * 1000:.2f}",
+            f"total;dur={total_ms:.2f}",
+        ])
+
+    def log_line(self, request, status_code: int) -> str:
+        slowest = self.slowest_statement
+        if slowest:
+            slowest = " ".join(slowest.split())[:SLOWEST_STATEMENT_CHARS]
+
+        return json.dumps({
+            "event": "request",
+            "method": request.method,
+            "path": request.url.path,
+            "status": status_code,
+            "duration_ms": round((perf_counter() - self.started) * 1000, 2),
+            "db_queries": self.count,
+            "db_ms": round(self.db_seconds * 1000, 2),
+            "db_slowest_ms": round(self.slowest_seconds * 1000, 2),
+            "db_slowest": slowest,
+        })
+
+
+# Set per request by the middleware; None = this request is not being timed
+request_query_stats: ContextVar = ContextVar("request_query_stats", default=None)
+
+
+def start_request_stats():
+    sampled = SQL_TIMING_SAMPLE_RATE > 0 and random.random() < SQL_TIMING_SAMPLE_RATE
+    stats = RequestQueryStats() if sampled else None
+    request_query_stats.set(stats)
+    return stats
+
+
+# ---------------- ENGINE EVENTS (ALL ENGINES) ----------------
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context: it lives exactly as long as this statement
+    if context is not None and request_query_stats.get() is not None:
+        context._query_started = perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = request_query_stats.get()
+    started = getattr(context, "_query_started", None)
+    if stats is not None and started is not None:
+        stats.observe(statement, perf_counter() - started)
+
+
+# ---------------- MIDDLEWARE ----------------
+class SQLTimingMiddleware:
+    """
+    Sampled requests get a Server-Timing header and a JSON access log line.
+
+    Pure ASGI so the stats are only finalized once the last body chunk is
+    sent: queries run by a streamed body (calendar, CSV export) are counted.
+    Streamed responses get no Server-Timing header, as their headers go out
+    before the body has run; the log line still covers them.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = start_request_stats()
+        if stats is None:
+            return await self.app(scope, receive, send)
+
+        start_message = None
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal start_message, status
+            if message["type"] == "http.response.start":
+                # Held until the first body chunk shows whether more will follow
+                start_message = message
+                status = message["status"]
+                return
+
+            if start_message is not None:
+                if message["type"] == "http.response.body" and not message.get("more_body", False):
+                    MutableHeaders(scope=start_message).append("Server-Timing", stats.server_timing())
+                await send(start_message)
+                start_message = None
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            access_log.info(stats.log_line(Request(scope), status))
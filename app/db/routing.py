@@ -0,0 +1,135 @@
+import os
+import time
+
+from fastapi import Request, Response
+from sqlalchemy import text
+
+from app.db.session import (
+    DATABASE_REPLICA_URL,
+    SessionLocal,
+    AsyncSessionLocal,
+    ReplicaSessionLocal,
+    AsyncReplicaSessionLocal,
+    replica_engine,
+    async_replica_engine,
+)
+
+
+# Staleness policy: reads go to the primary while the replica lags more than this
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", 5))
+REPLICA_LAG_CHECK_SECONDS = float(os.getenv("REPLICA_LAG_CHECK_SECONDS", 2))
+
+# Read-your-writes: after a successful write the client reads from the primary.
+# The SPA is cross-origin, so the pin travels both as a SameSite=None cookie and
+# as a response header the client echoes back on its next requests.
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+READ_PRIMARY_COOKIE = "read_primary_until"
+READ_PRIMARY_HEADER = "X-Read-Primary-Until"
+
+# Non-GET endpoints that only read: they must not pin the client to the primary
+READ_ONLY_ROUTES = {
+    ("POST", "/bookings/quote"),
+}
+
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaLagMonitor:
+    """Caches the replica's replay lag for REPLICA_LAG_CHECK_SECONDS"""
+
+    def __init__(self):
+        self.lag = None
+        self.checked_at = 0.0
+
+    def _due(self) -> bool:
+        return time.monotonic() - self.checked_at >= REPLICA_LAG_CHECK_SECONDS
+
+    def _record(self, lag):
+        self.lag = lag
+        self.checked_at = time.monotonic()
+
+    def is_fresh(self) -> bool:
+        if self._due():
+            try:
+                with replica_engine.connect() as conn:
+                    self._record(float(conn.execute(REPLICA_LAG_SQL).scalar()))
+            except Exception:
+                self._record(None)  # unreachable replica counts as stale
+        return self.lag is not None and self.lag <= REPLICA_MAX_LAG_SECONDS
+
+    async def is_fresh_async(self) -> bool:
+        if self._due():
+            try:
+                async with async_replica_engine.connect() as conn:
+                    self._record(float((await conn.execute(REPLICA_LAG_SQL)).scalar()))
+            except Exception:
+                self._record(None)
+        return self.lag is not None and self.lag <= REPLICA_MAX_LAG_SECONDS
+
+
+replica_lag = ReplicaLagMonitor()
+
+
+# ---------------- READ-YOUR-WRITES WINDOW ----------------
+def is_write_request(request: Request) -> bool:
+    if request.method in ("GET", "HEAD", "OPTIONS"):
+        return False
+    route = request.scope.get("route")  # set once the router has matched
+    return (request.method, getattr(route, "path", None)) not in READ_ONLY_ROUTES
+
+
+def mark_recent_write(response: Response):
+    until = str(int(time.time()) + READ_YOUR_WRITES_SECONDS)
+    response.headers[READ_PRIMARY_HEADER] = until
+    response.set_cookie(
+        READ_PRIMARY_COOKIE,
+        until,
+        max_age=READ_YOUR_WRITES_SECONDS,
+        httponly=True,
+        samesite="none",  # sent on the SPA's cross-site requests
+        secure=True,
+    )
+
+
+def wrote_recently(request: Request) -> bool:
+    now = time.time()
+    for value in (request.headers.get(READ_PRIMARY_HEADER), request.cookies.get(READ_PRIMARY_COOKIE)):
+        try:
+            # Client-supplied: ignore deadlines beyond the window we ever hand out
+            if value and now < int(value) <= now + READ_YOUR_WRITES_SECONDS + 1:
+                return True
+        except ValueError:
+            pass
+    return False
+
+
+# ---------------- ROUTED READ SESSIONS ----------------
+def read_sessionmaker(request: Request):
+    if not DATABASE_REPLICA_URL or wrote_recently(request) or not replica_lag.is_fresh():
+        return SessionLocal
+    return ReplicaSessionLocal
+
+
+async def async_read_sessionmaker(request: Request):
+    if not DATABASE_REPLICA_URL or wrote_recently(request) or not await replica_lag.is_fresh_async():
+        return AsyncSessionLocal
+    return AsyncReplicaSessionLocal
+
+
+def get_read_db(request: Request):
+    db = read_sessionmaker(request)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    async with (await async_read_sessionmaker(request))() as db:
+        yield db
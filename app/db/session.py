@@ -1,14 +1,86 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
 import os
 
+from app.db.pool_stats import InstrumentedQueuePool, InstrumentedAsyncQueuePool
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")  # optional streaming replica
+
+# Pool tuning (defaults match SQLAlchemy's, plus pre-ping)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", -1))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
 
-engine = create_engine(DATABASE_URL)
+POOL_OPTIONS = dict(
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+
+engine = create_engine(DATABASE_URL, poolclass=InstrumentedQueuePool, **POOL_OPTIONS)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+# ---------------- ASYNC ENGINE (asyncpg, read-heavy endpoints) ----------------
+def async_database_url(url: str) -> str:
+    """postgres[ql][+driver]://... -> postgresql+asyncpg://..."""
+    scheme, rest = url.split("://", 1)
+    if scheme.split("+")[0] in ("postgres", "postgresql"):
+        scheme = "postgresql+asyncpg"
+    return f"{scheme}://{rest}"
+
+
+async_engine = create_async_engine(
+    async_database_url(DATABASE_URL),
+    poolclass=InstrumentedAsyncQueuePool,
+    **POOL_OPTIONS,
+)
+
+AsyncSessionLocal = sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+# ---------------- READ REPLICA (falls back to primary when unset) ----------------
+if DATABASE_REPLICA_URL:
+    replica_engine = create_engine(DATABASE_REPLICA_URL, **POOL_OPTIONS)
+    async_replica_engine = create_async_engine(
+        async_database_url(DATABASE_REPLICA_URL),
+        **POOL_OPTIONS,
+    )
+else:
+    replica_engine = engine
+    async_replica_engine = async_engine
+
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
+AsyncReplicaSessionLocal = sessionmaker(
+    bind=async_replica_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 Base = declarative_base()  # <--- missing Base class added here
+
+
+# ---------------- DB SESSION (shared by every router) ----------------
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
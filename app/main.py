@@ -1,8 +1,24 @@
-from fastapi import FastAPI
+import asyncio
+from time import perf_counter
+
+from fastapi import Depends, FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routes import auth, halls, hall_images, bookings, amenities
 from app.api.routes.admin_panel import router as admin_panel_router
+from app.api.routes.bookings import require_admin
+from app.core.principals import Principal
+from app.db.session import (
+    DATABASE_REPLICA_URL, SessionLocal, engine, async_engine, replica_engine, async_replica_engine
+)
+from app.db.pool_stats import pool_wait_stats, async_pool_wait_stats
+from app.db.query_stats import SQLTimingMiddleware
+from app.db.routing import READ_PRIMARY_HEADER, is_write_request, mark_recent_write
+from app.utils.availability import booking_index
+from app.utils.holds import run_hold_sweeper
+from app.core.refresh_tokens import run_refresh_token_purger
+from app.utils import metrics
+from app.core.security import shutdown_hash_pool
 
 
 app = FastAPI(
@@ -11,6 +27,10 @@ app = FastAPI(
     description="API for Hall Booking, Amenities, Users & Admin Management"
 )
 
+# SQL timing (added first = innermost): sees the route's own response
+# messages, so it can tell a streamed body from a complete one
+app.add_middleware(SQLTimingMiddleware)
+
 # CORS (important for frontend)
 app.add_middleware(
     CORSMiddleware,
@@ -18,8 +38,42 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # keyset pagination for /halls/, SQL timing, read-your-writes pin
+    expose_headers=["X-Next-Cursor", "Server-Timing", READ_PRIMARY_HEADER],
 )
 
+# Successful writes pin the client's reads to the primary for a short window;
+# clients echo the X-Read-Primary-Until header (cookies may be blocked cross-site)
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    response = await call_next(request)
+    if response.status_code < 400 and is_write_request(request):
+        mark_recent_write(response)
+    return response
+
+# Per-route latency, in-flight requests and pool gauges for /metrics
+DB_POOLS = {"sync": engine.pool, "async": async_engine.pool}
+if DATABASE_REPLICA_URL:
+    DB_POOLS.update({"replica": replica_engine.pool, "async_replica": async_replica_engine.pool})
+
+
+@app.middleware("http")
+async def prometheus_metrics(request: Request, call_next):
+    in_progress = metrics.REQUESTS_IN_PROGRESS.labels(request.method)
+    in_progress.inc()
+    started = perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        in_progress.dec()
+        metrics.REQUEST_SECONDS.labels(
+            request.method, metrics.route_template(request), str(status)
+        ).observe(perf_counter() - started)
+        metrics.observe_pools(DB_POOLS)
+
 # -------- ROUTERS REGISTER ORDER MATTERS --------
 app.include_router(auth.router)
 app.include_router(halls.router)
@@ -29,6 +83,68 @@ app.include_router(bookings.router)
 app.include_router(admin_panel_router)
 
 
+# -------- STARTUP: WARM BOOKING INTERVAL INDEX --------
+@app.on_event("startup")
+def load_booking_index():
+    db = SessionLocal()
+    try:
+        booking_index.load(db)
+    finally:
+        db.close()
+
+
+# -------- BACKGROUND: RELEASE EXPIRED PAYMENT HOLDS --------
+@app.on_event("startup")
+async def start_hold_sweeper():
+    app.state.hold_sweeper = asyncio.create_task(run_hold_sweeper())
+
+
+@app.on_event("startup")
+async def start_refresh_token_purger():
+    app.state.refresh_token_purger = asyncio.create_task(run_refresh_token_purger())
+
+
+@app.on_event("shutdown")
+async def stop_hold_sweeper():
+    app.state.hold_sweeper.cancel()
+
+
+@app.on_event("shutdown")
+async def stop_refresh_token_purger():
+    app.state.refresh_token_purger.cancel()
+
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    await async_engine.dispose()
+    await async_replica_engine.dispose()
+
+
+@app.on_event("shutdown")
+def stop_hash_pool():
+    shutdown_hash_pool()
+
+
+@app.on_event("shutdown")
+def release_worker_metrics():
+    metrics.mark_worker_dead()
+
+
 @app.get("/", tags=["Root"])
 def root():
     return {"message": "Backend running successfully"}
+
+
+@app.get("/pool-stats", tags=["Root"])
+def pool_stats(admin: Principal = Depends(require_admin)):
+    return {
+        "sync": pool_wait_stats.snapshot(engine.pool),
+        "async": async_pool_wait_stats.snapshot(async_engine.pool),
+    }
+
+
+@app.get("/metrics", tags=["Root"], include_in_schema=False)
+def prometheus_scrape():
+    metrics.observe_pools(DB_POOLS)
+    body, content_type = metrics.render_metrics()
+    return Response(content=body, media_type=content_type)
@@ -5,3 +5,4 @@ from .booking import Booking
 from .amenities import Amenity
 from .hall_amenities import HallAmenity
 from .hall_image import HallImage
+from .refresh_token import RefreshToken
@@ -1,12 +1,20 @@
-from sqlalchemy import Column, Integer, String, Date, Time, Float, ForeignKey
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Date, Time, DateTime, Float, ForeignKey, Computed, Index
+from sqlalchemy.dialects.postgresql import TSRANGE, ExcludeConstraint
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 
+
+# Statuses that occupy the hall (held = awaiting online payment)
+ACTIVE_STATUSES = ("booked", "held")
+
+
 class Booking(Base):
     __tablename__ = "bookings"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     hall_id = Column(Integer, ForeignKey("halls.id"))
 
     start_date = Column(Date, nullable=False)
@@ -14,7 +22,15 @@ class Booking(Base):
     start_time = Column(Time, nullable=False)
     end_time = Column(Time, nullable=False)
 
-    status = Column(String, default="booked")
+    # [start, end) as a single range, derived by Postgres from the four fields above
+    period = Column(
+        TSRANGE,
+        Computed("tsrange(start_date + start_time, end_date + end_time, '[)')", persisted=True),
+        nullable=False,
+    )
+
+    status = Column(String, default="booked")  # booked | held | expired | cancelled
+    hold_expires_at = Column(DateTime, nullable=True)  # UTC, only while status == "held"
     total_price = Column(Float, nullable=False)
 
     # NEW PAYMENT FIELDS
@@ -27,3 +43,37 @@ class Booking(Base):
 
     user = relationship("User")
     hall = relationship("Hall")
+
+    __table_args__ = (
+        Index("ix_bookings_period", "period", postgresql_using="gist"),
+        Index("ix_bookings_hall_id_start_date", "hall_id", "start_date"),
+        Index(
+            "ix_bookings_active_hall_dates",
+            "hall_id",
+            "start_date",
+            "end_date",
+            postgresql_where="status IN ('booked', 'held')",
+        ),
+        Index(
+            "ix_bookings_hold_expiry",
+            "hold_expires_at",
+            postgresql_where="status = 'held'",
+        ),
+        # No two active bookings of the same hall may overlap
+        ExcludeConstraint(
+            ("hall_id", "="),
+            ("period", "&&"),
+            name="excl_bookings_hall_period",
+            using="gist",
+            where="status IN ('booked', 'held')",
+        ),
+    )
+
+    # Absolute start/end of the booked interval ([starts_at, ends_at))
+    @property
+    def starts_at(self) -> datetime:
+        return datetime.combine(self.start_date, self.start_time)
+
+    @property
+    def ends_at(self) -> datetime:
+        return datetime.combine(self.end_date, self.end_time)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, Float
+from sqlalchemy import Column, Integer, String, Boolean, Float, Index
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 
@@ -19,6 +19,9 @@ class Hall(Base):
     weekend_price_multiplier = Column(Float, nullable=False, default=1.0)
     security_deposit = Column(Float, nullable=False, default=0.0)
 
+    # Bumped whenever pricing changes; part of the quote cache key
+    pricing_version = Column(Integer, nullable=False, default=1, server_default="1")
+
     deleted = Column(Boolean, default=False)
 
     # Relationships
@@ -30,3 +33,14 @@ class Hall(Base):
 
     images = relationship("HallImage", back_populates="hall", cascade="all, delete")
     bookings = relationship("Booking", back_populates="hall")
+
+    __table_args__ = (
+        Index("ix_halls_active_id", "id", postgresql_where="deleted = false"),
+        Index("ix_halls_active_capacity", "capacity", postgresql_where="deleted = false"),
+        Index(
+            "ix_halls_location_trgm",
+            "location",
+            postgresql_using="gin",
+            postgresql_ops={"location": "gin_trgm_ops"},
+        ),
+    )
@@ -7,7 +7,7 @@ class HallImage(Base):
     __tablename__ = "hall_images"
 
     id = Column(Integer, primary_key=True, index=True)
-    hall_id = Column(Integer, ForeignKey("halls.id"), nullable=False)
+    hall_id = Column(Integer, ForeignKey("halls.id"), nullable=False, index=True)
 
     image_url = Column(String, nullable=False)
     public_id = Column(String, nullable=False)  # Cloudinary public ID (for delete)
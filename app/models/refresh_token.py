@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from app.db.session import Base
+
+
+class RefreshToken(Base):
+    """
+    Opaque refresh token, stored as sha256(token) only. Every refresh rotates
+    the token within the same family; presenting an already-rotated token
+    revokes the whole family (the token was stolen or replayed).
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    token_hash = Column(String(64), nullable=False, unique=True)  # sha256 hex, lookup key
+    family_id = Column(String(32), nullable=False, index=True)
+
+    role = Column(String, nullable=False)         # user | admin
+    account_id = Column(Integer, nullable=False)  # users.id or admins.id, depending on role
+
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('ix_refresh_tokens_account', 'role', 'account_id'),
+    )
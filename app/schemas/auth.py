@@ -0,0 +1,5 @@
+from pydantic import BaseModel
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
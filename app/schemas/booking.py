@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import List, Optional
 from datetime import date, time
 
 class BookingBase(BaseModel):
@@ -21,3 +22,23 @@ class BookingOut(BookingBase):
     booked_by_email: str
 
     model_config = {"from_attributes": True}
+
+
+class QuoteItem(BookingBase):
+    pass
+
+class QuoteRequest(BaseModel):
+    items: List[QuoteItem]
+
+
+class RecurringBookingCreate(BaseModel):
+    hall_id: int
+    start_date: date          # first occurrence
+    start_time: time
+    end_time: time            # before start_time = ends next day
+    freq: str = "weekly"      # daily | weekly | monthly
+    interval: int = 1
+    count: Optional[int] = None
+    until: Optional[date] = None
+    by_weekday: Optional[List[int]] = None  # weekly only, 0 = Monday
+    mode: str = "all_or_nothing"            # all_or_nothing | best_effort
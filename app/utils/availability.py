@@ -0,0 +1,227 @@
+from bisect import bisect_left
+from datetime import date, datetime, time
+from threading import Lock
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.booking import Booking, ACTIVE_STATUSES
+
+
+def period_range(starts_at: datetime, ends_at: datetime):
+    """SQL tsrange literal for [starts_at, ends_at), comparable with Booking.period"""
+    return func.tsrange(starts_at, ends_at, "[)")
+
+
+def has_timezone(*values) -> bool:
+    """
+    Booking times are naive wall-clock values (TIMESTAMP WITHOUT TIME ZONE);
+    an aware datetime/time cannot be compared with them, and tsrange() has
+    no timestamptz variant.
+    """
+    return any(v.tzinfo is not None for v in values)
+
+
+class HallIntervalIndex:
+    """
+    In-memory, per-hall sorted list of booked [start, end) intervals.
+
+    Answers "is [start, end) free?" with one bisect per lookup. The index is
+    a fast pre-check only: it never sees bookings written by other workers,
+    so the database stays the final authority on conflicts.
+
+    Intervals of a hall may overlap (a cancellation made by another worker
+    leaves its entry behind), so a running max of end times is kept next to
+    the sorted starts. Entries that ended before today are pruned on the
+    first call of each day.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._starts = {}    # hall_id -> sorted list of start datetimes
+        self._entries = {}   # hall_id -> list of (start, end, booking_id), same order
+        self._max_ends = {}  # hall_id -> max end over entries[:i + 1], same order
+        self._by_id = {}     # booking_id -> (hall_id, entry)
+        self.loaded_from = None  # bookings ending before this date are not indexed
+
+    # ---------------- LOAD ----------------
+    def load(self, db: Session):
+        today = date.today()
+
+        rows = db.query(
+            Booking.id,
+            Booking.hall_id,
+            Booking.start_date,
+            Booking.start_time,
+            Booking.end_date,
+            Booking.end_time,
+        ).filter(
+            Booking.status.in_(ACTIVE_STATUSES),
+            Booking.end_date >= today,
+        ).all()
+
+        entries = {}
+        for r in rows:
+            entries.setdefault(r.hall_id, []).append((
+                datetime.combine(r.start_date, r.start_time),
+                datetime.combine(r.end_date, r.end_time),
+                r.id,
+            ))
+
+        for hall_entries in entries.values():
+            hall_entries.sort()
+
+        with self._lock:
+            self._entries = entries
+            self._by_id = {e[2]: (hid, e) for hid, es in entries.items() for e in es}
+            self._starts = {hid: [e[0] for e in es] for hid, es in entries.items()}
+            self._max_ends = {}
+            for hall_id in entries:
+                self._rebuild_max_ends(hall_id)
+            self.loaded_from = today
+
+    # ---------------- QUERY ----------------
+    def is_free(self, hall_id: int, start: datetime, end: datetime):
+        """
+        True/False when the index can answer, None when it cannot
+        (not loaded yet, or the window starts before the indexed horizon).
+        """
+        with self._lock:
+            self._prune_past()
+            if self.loaded_from is None or start.date() < self.loaded_from:
+                return None
+
+            starts = self._starts.get(hall_id)
+            if not starts:
+                return True
+
+            # Only intervals starting before `end` can overlap; free if all end by `start`
+            i = bisect_left(starts, end)
+            if i == 0:
+                return True
+
+            return self._max_ends[hall_id][i - 1] <= start
+
+    # ---------------- UPDATE ----------------
+    def add(self, hall_id: int, booking_id: int, start: datetime, end: datetime):
+        with self._lock:
+            self._prune_past()
+            entries = self._entries.setdefault(hall_id, [])
+            starts = self._starts.setdefault(hall_id, [])
+
+            entry = (start, end, booking_id)
+            i = bisect_left(entries, entry)
+            entries.insert(i, entry)
+            starts.insert(i, start)
+            self._by_id[booking_id] = (hall_id, entry)
+            self._rebuild_max_ends(hall_id, i)
+
+    def remove(self, booking_id: int):
+        with self._lock:
+            found = self._by_id.pop(booking_id, None)
+            if not found:
+                return
+
+            hall_id, entry = found
+            i = bisect_left(self._entries[hall_id], entry)
+            del self._entries[hall_id][i]
+            del self._starts[hall_id][i]
+            self._rebuild_max_ends(hall_id, i)
+
+    # ---------------- INTERNALS (lock held) ----------------
+    def _rebuild_max_ends(self, hall_id: int, i: int = 0):
+        max_ends = self._max_ends.setdefault(hall_id, [])
+        del max_ends[i:]
+
+        running = max_ends[-1] if max_ends else None
+        for _, end, _ in self._entries[hall_id][i:]:
+            if running is None or end > running:
+                running = end
+            max_ends.append(running)
+
+    def _prune_past(self):
+        """Drop intervals that ended before today and move the horizon up"""
+        today = date.today()
+        if self.loaded_from is None or self.loaded_from >= today:
+            return
+
+        cutoff = datetime.combine(today, time.min)
+        for hall_id, entries in self._entries.items():
+            kept = [e for e in entries if e[1] > cutoff]
+            if len(kept) == len(entries):
+                continue
+
+            for e in entries:
+                if e[1] <= cutoff:
+                    self._by_id.pop(e[2], None)
+            self._entries[hall_id] = kept
+            self._starts[hall_id] = [e[0] for e in kept]
+            self._rebuild_max_ends(hall_id)
+
+        self.loaded_from = today
+
+
+booking_index = HallIntervalIndex()
+
+
+# =====================================================================
+#                    DAY BITMAPS (AVAILABLE DATES)
+# =====================================================================
+# Bit i of a bitmap set = day (first_day + i) is booked.
+
+def day_bitmap(ranges, first_day: date, last_day: date) -> int:
+    """Rasterize inclusive (start_date, end_date) ranges onto [first_day, last_day]"""
+    mask = 0
+    for start, end in ranges:
+        lo = (max(start, first_day) - first_day).days
+        hi = (min(end, last_day) - first_day).days
+        if hi >= lo:
+            mask |= ((1 << (hi - lo + 1)) - 1) << lo
+    return mask
+
+
+def free_day_offsets(mask: int, lo: int, hi: int):
+    """Offsets in [lo, hi] whose bit is clear, in ascending order"""
+    free = ~mask & (((1 << (hi - lo + 1)) - 1) << lo)
+    offsets = []
+    while free:
+        low_bit = free & -free
+        offsets.append(low_bit.bit_length() - 1)
+        free ^= low_bit
+    return offsets
+
+
+# =====================================================================
+#                    MINUTE BINS (FREE SLOTS)
+# =====================================================================
+# One byte per bin of `bin_minutes`, 1 = (partly) booked. Slice assignment
+# and bytearray.find() keep the per-bin work in C.
+
+def busy_bins(intervals, range_start: datetime, bin_minutes: int, bin_count: int) -> bytearray:
+    """Rasterize [start, end) datetimes onto bins starting at range_start"""
+    busy = bytearray(bin_count)
+    bin_seconds = bin_minutes * 60
+
+    for start, end in intervals:
+        lo = max(0, int((start - range_start).total_seconds() // bin_seconds))
+        hi = min(bin_count, -int(-(end - range_start).total_seconds() // bin_seconds))
+        if hi > lo:
+            busy[lo:hi] = b"\x01" * (hi - lo)
+
+    return busy
+
+
+def free_runs(busy: bytearray, min_bins: int = 1):
+    """(first, last + 1) bin index of every free run at least min_bins long"""
+    runs = []
+    i = busy.find(0)
+
+    while i != -1:
+        j = busy.find(1, i)
+        if j == -1:
+            j = len(busy)
+        if j - i >= min_bins:
+            runs.append((i, j))
+        i = busy.find(0, j)
+
+    return runs
@@ -3,6 +3,8 @@ import cloudinary.uploader
 import os
 from dotenv import load_dotenv
 
+from app.utils.metrics import EXTERNAL_CALL_SECONDS
+
 load_dotenv()
 
 cloudinary.config(
@@ -13,13 +15,14 @@ cloudinary.config(
 
 def upload_image(image_bytes: bytes):
     try:
-        result = cloudinary.uploader.upload(
-            image_bytes,
-            folder="hall_images",
-            resource_type="image",
-            format="jpg",          # force output as JPG
-            quality="90"
-        )
+        with EXTERNAL_CALL_SECONDS.labels("cloudinary", "upload").time():
+            result = cloudinary.uploader.upload(
+                image_bytes,
+                folder="hall_images",
+                resource_type="image",
+                format="jpg",          # force output as JPG
+                quality="90"
+            )
 
         return {
             "url": result.get("secure_url"),
@@ -32,7 +35,8 @@ def upload_image(image_bytes: bytes):
 
 def delete_image(public_id: str):
     try:
-        cloudinary.uploader.destroy(public_id, invalidate=True)
+        with EXTERNAL_CALL_SECONDS.labels("cloudinary", "destroy").time():
+            cloudinary.uploader.destroy(public_id, invalidate=True)
         return True
     except Exception as e:
         print("Cloudinary delete error:", e)
@@ -0,0 +1,72 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.db.session import SessionLocal
+from app.utils.availability import booking_index
+
+
+HOLD_MINUTES = int(os.getenv("BOOKING_HOLD_MINUTES", 15))
+HOLD_SWEEP_SECONDS = int(os.getenv("BOOKING_HOLD_SWEEP_SECONDS", 60))
+HOLD_SWEEP_BATCH = int(os.getenv("BOOKING_HOLD_SWEEP_BATCH", 500))
+
+RELEASE_EXPIRED_HOLDS_SQL = """
+    UPDATE bookings SET status = 'expired'
+    WHERE id IN (
+        SELECT id FROM bookings
+        WHERE status = 'held'
+          AND hold_expires_at < :now
+          {hall_filter}
+        ORDER BY hold_expires_at
+        LIMIT :batch
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id
+"""
+
+
+def hold_expiry() -> datetime:
+    return datetime.utcnow() + timedelta(minutes=HOLD_MINUTES)
+
+
+def release_expired_holds(db: Session, hall_id: int | None = None, batch: int = HOLD_SWEEP_BATCH):
+    """Mark up to `batch` expired holds as expired, commit, and return their ids"""
+    params = {"now": datetime.utcnow(), "batch": batch}
+    hall_filter = ""
+    if hall_id is not None:
+        hall_filter = "AND hall_id = :hall_id"
+        params["hall_id"] = hall_id
+
+    released = [
+        row.id
+        for row in db.execute(text(RELEASE_EXPIRED_HOLDS_SQL.format(hall_filter=hall_filter)), params)
+    ]
+    db.commit()
+
+    for booking_id in released:
+        booking_index.remove(booking_id)
+
+    return released
+
+
+# ---------------- BACKGROUND SWEEPER ----------------
+def sweep_expired_holds():
+    db = SessionLocal()
+    try:
+        while len(release_expired_holds(db)) == HOLD_SWEEP_BATCH:
+            pass
+    finally:
+        db.close()
+
+
+async def run_hold_sweeper():
+    while True:
+        await asyncio.sleep(HOLD_SWEEP_SECONDS)
+        try:
+            await run_in_threadpool(sweep_expired_holds)
+        except Exception as e:
+            print("Hold sweeper error:", e)
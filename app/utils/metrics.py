@@ -0,0 +1,99 @@
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+
+
+# With several uvicorn workers each process writes its samples to files in
+# this directory and /metrics merges them (must be set before workers start)
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+
+# ---------------- HTTP ----------------
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests currently being handled",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+# ---------------- DB POOL ----------------
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured pool size", ["pool"], multiprocess_mode="livesum")
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Connections in use", ["pool"], multiprocess_mode="livesum"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Connections open beyond pool_size", ["pool"], multiprocess_mode="livesum"
+)
+
+# ---------------- EXTERNAL CALLS ----------------
+EXTERNAL_CALL_SECONDS = Histogram(
+    "external_call_duration_seconds",
+    "Latency of calls to third-party APIs",
+    ["service", "operation"],
+)
+
+# ---------------- PASSWORD HASHING POOL ----------------
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_duration_seconds", "bcrypt time inside the hashing pool", ["operation"]
+)
+PASSWORD_HASH_QUEUE_SECONDS = Histogram(
+    "password_hash_queue_seconds", "Time hash jobs wait for a pool worker", ["operation"]
+)
+PASSWORD_HASH_PENDING = Gauge(
+    "password_hash_pending", "Hash jobs queued or running", multiprocess_mode="livesum"
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total", "Hash jobs refused because the queue was full"
+)
+
+# ---------------- AUTH THROTTLING ----------------
+AUTH_THROTTLED = Counter(
+    "auth_requests_throttled_total", "Login/registration requests rejected with 429", ["action", "reason"]
+)
+
+# ---------------- BUSINESS ----------------
+BOOKINGS_CREATED = Counter("bookings_created_total", "Bookings created", ["payment_mode"])
+BOOKINGS_CANCELLED = Counter("bookings_cancelled_total", "Bookings cancelled by users")
+PAYMENTS_VERIFIED = Counter("payments_verified_total", "Razorpay payment verifications", ["result"])
+
+
+def route_template(request) -> str:
+    """Matched route path (e.g. /halls/{hall_id}); keeps label cardinality bounded"""
+    route = request.scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+def observe_pools(pools: dict):
+    for name, pool in pools.items():
+        DB_POOL_SIZE.labels(name).set(pool.size())
+        DB_POOL_CHECKED_OUT.labels(name).set(pool.checkedout())
+        DB_POOL_OVERFLOW.labels(name).set(max(pool.overflow(), 0))
+
+
+def render_metrics():
+    if PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead():
+    # Drops this worker's livesum gauges from the merged totals
+    if PROMETHEUS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
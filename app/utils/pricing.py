@@ -1,34 +1,125 @@
-from datetime import timedelta
+from collections import OrderedDict
+from datetime import date, timedelta
+from threading import Lock
+from fastapi import HTTPException
+import os
 
-def calculate_booking_price(hall, start_date, end_date, start_time, end_time):
-    total = 0
 
-    # Number of days
-    day_count = (end_date - start_date).days + 1
+# Saturday, Sunday as [5, 7) in date.weekday() terms
+WEEKEND_START = 5
+
+
+def _overlap(a_start: int, a_end: int, b_start: int, b_end: int) -> int:
+    return max(0, min(a_end, b_end) - max(a_start, b_start))
+
+
+def count_weekend_days(first_day: date, days: int) -> int:
+    """Number of Saturdays/Sundays among `days` consecutive days from first_day"""
+    if days <= 0:
+        return 0
+
+    full_weeks, rest = divmod(days, 7)
+    wd = first_day.weekday()
+
+    # Leftover days cover [wd, wd + rest) which can wrap into the next week
+    return (
+        full_weeks * 2
+        + _overlap(wd, wd + rest, WEEKEND_START, 7)
+        + _overlap(wd, wd + rest, WEEKEND_START + 7, 14)
+    )
 
-    # If same day, calculate hours
+
+def calculate_price(hall, start_date, end_date, start_time, end_time):
+
+    # SAME DAY — HOURLY
     if start_date == end_date:
-        hours = (
-            datetime.combine(start_date, end_time) -
-            datetime.combine(start_date, start_time)
-        ).seconds / 3600
+        start_hr = start_time.hour + start_time.minute / 60
+        end_hr = end_time.hour + end_time.minute / 60
+        hours = end_hr - start_hr
+
+        if hours <= 0:
+            raise HTTPException(status_code=400, detail="Invalid hours")
 
         total = hours * hall.price_per_hour
-    else:
-        # multi-day booking = daily rate
-        total = day_count * hall.price_per_day
 
-    # Weekend extra charge
-    weekend_days = 0
-    d = start_date
-    while d <= end_date:
-        if d.weekday() in (5, 6):  # Saturday-Sunday
-            weekend_days += 1
-        d += timedelta(days=1)
+        # Weekend pricing
+        if start_date.weekday() >= 5:
+            total *= hall.weekend_price_multiplier
+
+        return round(total + hall.security_deposit, 2)
+
+    # MULTI-DAY PRICING
+    total = 0
+
+    # Day 1 partial hours
+    start_hours = 24 - (start_time.hour + start_time.minute / 60)
+    total += start_hours * hall.price_per_hour
 
-    total += weekend_days * hall.weekend_extra
+    # Full days between
+    full_days = (end_date - start_date).days - 1
+    if full_days > 0:
+        weekend_days = count_weekend_days(start_date + timedelta(days=1), full_days)
+        weekdays = full_days - weekend_days
+        total += hall.price_per_day * (weekdays + weekend_days * hall.weekend_price_multiplier)
+
+    # Last day partial hours
+    end_hours = end_time.hour + end_time.minute / 60
+    total += end_hours * hall.price_per_hour
+
+    if end_date.weekday() >= 5:
+        total *= hall.weekend_price_multiplier
 
-    # Add security deposit
     total += hall.security_deposit
 
     return round(total, 2)
+
+
+# =====================================================================
+#                         QUOTE CACHE (LRU)
+# =====================================================================
+class QuoteCache:
+    """
+    Bounded LRU of computed prices keyed by (hall_id, pricing_version, window).
+    Editing a hall's pricing bumps Hall.pricing_version, so stale entries
+    are never hit again and simply age out.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get_price(self, hall, start_date, end_date, start_time, end_time):
+        key = (hall.id, hall.pricing_version, start_date, end_date, start_time, end_time)
+
+        with self._lock:
+            price = self._entries.get(key)
+            if price is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return price
+            self.misses += 1
+
+        # Invalid windows raise here and are never cached
+        price = calculate_price(hall, start_date, end_date, start_time, end_time)
+
+        with self._lock:
+            self._entries[key] = price
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        return price
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+quote_cache = QuoteCache(int(os.getenv("QUOTE_CACHE_SIZE", 10000)))
@@ -0,0 +1,61 @@
+from calendar import monthrange
+from datetime import date, datetime, time, timedelta
+
+
+FREQUENCIES = ("daily", "weekly", "monthly")
+
+# Largest INTERVAL per frequency: one step of at most about a year
+MAX_INTERVAL = {"daily": 365, "weekly": 52, "monthly": 12}
+
+
+def occurrence_dates(start_date: date, freq: str, interval: int = 1,
+                     count: int | None = None, until: date | None = None,
+                     by_weekday: list[int] | None = None, limit: int = 366):
+    """
+    RRULE-style expansion (FREQ, INTERVAL, COUNT, UNTIL, BYDAY for weekly).
+    Monthly occurrences keep start_date's day of month and skip months
+    that do not have it. Expansion stops at count, until or limit.
+    """
+    max_count = limit if count is None else min(count, limit)
+    dates = []
+
+    if freq == "daily":
+        d = start_date
+        while len(dates) < max_count and (until is None or d <= until):
+            dates.append(d)
+            d += timedelta(days=interval)
+
+    elif freq == "weekly":
+        weekdays = sorted(set(by_weekday or [start_date.weekday()]))
+        week_start = start_date - timedelta(days=start_date.weekday())
+        while len(dates) < max_count:
+            for wd in weekdays:
+                d = week_start + timedelta(days=wd)
+                if d < start_date:
+                    continue
+                if (until is not None and d > until) or len(dates) >= max_count:
+                    return dates
+                dates.append(d)
+            week_start += timedelta(weeks=interval)
+
+    elif freq == "monthly":
+        year, month = start_date.year, start_date.month
+        while len(dates) < max_count:
+            if start_date.day <= monthrange(year, month)[1]:
+                d = date(year, month, start_date.day)
+                if until is not None and d > until:
+                    break
+                dates.append(d)
+            year, month = divmod(year * 12 + month - 1 + interval, 12)
+            month += 1
+
+    else:
+        raise ValueError(f"Unsupported frequency {freq}")
+
+    return dates
+
+
+def occurrence_window(day: date, start_time: time, end_time: time):
+    """[start, end) of one occurrence; an end time before the start runs overnight"""
+    end_day = day if end_time > start_time else day + timedelta(days=1)
+    return datetime.combine(day, start_time), datetime.combine(end_day, end_time)
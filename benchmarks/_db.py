@@ -0,0 +1,66 @@
+"""
+Shared benchmark setup. BENCH_DATABASE_URL must point at a disposable
+PostgreSQL database (btree_gist and pg_trgm available) — it is wiped.
+Call use_bench_database() before importing anything from app.
+"""
+import os
+import sys
+
+from sqlalchemy import text
+
+BENCH_DATABASE_URL = os.getenv("BENCH_DATABASE_URL")
+
+LOCATIONS = ("Hyderabad", "Chennai", "Bengaluru", "Mumbai")
+
+SEED_HALLS_SQL = text("""
+    INSERT INTO halls (name, description, capacity, address, location, price_per_hour,
+                       price_per_day, weekend_price_multiplier, security_deposit, deleted, pricing_version)
+    SELECT 'hall ' || h, 'benchmark hall', 50 + h % 500, h || ' Bench Road',
+           (ARRAY['Hyderabad', 'Chennai', 'Bengaluru', 'Mumbai'])[1 + h % 4],
+           100, 1000, 1.5, 500, false, 1
+    FROM generate_series(1, :halls) h
+""")
+
+# One 10:00-12:00 booking per hall per day from today on: never overlapping
+SEED_BOOKINGS_SQL = text("""
+    INSERT INTO bookings (user_id, hall_id, start_date, end_date, start_time, end_time,
+                          status, total_price, payment_mode, payment_status)
+    SELECT 1, h, CURRENT_DATE + d, CURRENT_DATE + d, '10:00', '12:00',
+           'booked', 100, 'venue', 'pending'
+    FROM generate_series(1, :halls) h, generate_series(0, :days - 1) d
+""")
+
+
+def use_bench_database():
+    if not BENCH_DATABASE_URL:
+        sys.exit("Set BENCH_DATABASE_URL to a disposable PostgreSQL database (it will be wiped)")
+
+    # app.db.session reads these at import time
+    os.environ["DATABASE_URL"] = BENCH_DATABASE_URL
+    os.environ["DATABASE_REPLICA_URL"] = ""
+    os.environ["SQL_TIMING_SAMPLE_RATE"] = "0"
+
+
+def reset_schema():
+    from app.db.session import Base, engine
+    import app.models  # noqa: F401  registers every table on Base
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def seed(engine, halls: int, days_per_hall: int):
+    with engine.begin() as conn:
+        conn.execute(text("TRUNCATE bookings, hall_amenities, halls, users RESTART IDENTITY CASCADE"))
+        conn.execute(text(
+            "INSERT INTO users (name, email, password_hash) VALUES ('bench', 'bench@example.com', 'x')"
+        ))
+        conn.execute(SEED_HALLS_SQL, {"halls": halls})
+        if days_per_hall:
+            conn.execute(SEED_BOOKINGS_SQL, {"halls": halls, "days": days_per_hall})
+        conn.execute(text("ANALYZE"))
@@ -0,0 +1,70 @@
+"""
+In-memory HallIntervalIndex vs. the DB overlap probe (find_conflict) at
+growing booking counts.
+
+    BENCH_DATABASE_URL=postgresql://... python -m benchmarks.interval_index [sizes...]
+
+Sizes default to 10k, 100k and 1M bookings, spread over BENCH_HALLS halls.
+"""
+import os
+import random
+import sys
+from datetime import date, datetime, time, timedelta
+from time import perf_counter
+
+from benchmarks._db import use_bench_database, reset_schema, seed
+
+use_bench_database()
+
+from app.api.routes.bookings import find_conflict  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+from app.utils.availability import HallIntervalIndex  # noqa: E402
+
+HALLS = int(os.getenv("BENCH_HALLS", 1000))
+LOOKUPS = int(os.getenv("BENCH_LOOKUPS", 20000))
+DB_LOOKUPS = int(os.getenv("BENCH_DB_LOOKUPS", 2000))
+
+
+def random_windows(n: int, days: int, rng: random.Random):
+    windows = []
+    for _ in range(n):
+        day = date.today() + timedelta(days=rng.randrange(days))
+        start = datetime.combine(day, time(rng.randrange(6, 20)))
+        windows.append((rng.randrange(1, HALLS + 1), start, start + timedelta(hours=rng.randrange(1, 4))))
+    return windows
+
+
+def per_call_us(fn, items):
+    started = perf_counter()
+    for item in items:
+        fn(*item)
+    return (perf_counter() - started) / len(items) * 1e6
+
+
+def main(sizes):
+    engine = reset_schema()
+    rng = random.Random(7)
+
+    print(f"{'bookings':>10} {'index load':>11} {'index lookup':>13} {'db probe':>10} {'speedup':>8}")
+    for size in sizes:
+        days = max(1, size // HALLS)
+        seed(engine, HALLS, days)
+        windows = random_windows(max(LOOKUPS, DB_LOOKUPS), days, rng)
+
+        db = SessionLocal()
+        try:
+            index = HallIntervalIndex()
+            started = perf_counter()
+            index.load(db)
+            load_s = perf_counter() - started
+
+            index_us = per_call_us(index.is_free, windows[:LOOKUPS])
+            db_us = per_call_us(lambda h, s, e: find_conflict(db, h, s, e), windows[:DB_LOOKUPS])
+        finally:
+            db.close()
+
+        print(f"{HALLS * days:>10,} {load_s:>10.2f}s {index_us:>11.2f}us {db_us:>8.0f}us {db_us / index_us:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main([int(s) for s in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
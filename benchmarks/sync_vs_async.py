@@ -0,0 +1,157 @@
+"""
+Requests/sec of one uvicorn worker: the async (asyncpg) list_halls and
+available_dates handlers vs. sync twins running the same queries through a
+psycopg2 session in the threadpool.
+
+    BENCH_DATABASE_URL=postgresql://... python -m benchmarks.sync_vs_async
+
+BENCH_REQUESTS (per endpoint, default 2000) and BENCH_CONCURRENCY (default 50)
+tune the load.
+"""
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+from datetime import date, datetime, time, timedelta
+from time import perf_counter
+
+import httpx
+from fastapi import APIRouter, Depends
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+
+from benchmarks._db import use_bench_database, reset_schema, seed
+
+use_bench_database()
+
+from app.api.routes.bookings import parse_month  # noqa: E402
+from app.api.routes.halls import filter_halls  # noqa: E402
+from app.db.routing import get_read_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.booking import Booking, ACTIVE_STATUSES  # noqa: E402
+from app.models.hall import Hall  # noqa: E402
+from app.schemas.hall import HallOut  # noqa: E402
+from app.utils.availability import period_range, day_bitmap, free_day_offsets  # noqa: E402
+
+HALLS = 200
+DAYS_PER_HALL = 60
+REQUESTS = int(os.getenv("BENCH_REQUESTS", 2000))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", 50))
+PORT = int(os.getenv("BENCH_PORT", 8765))
+
+
+# =====================================================================
+#                  SYNC TWINS (same queries, psycopg2)
+# =====================================================================
+bench_router = APIRouter(prefix="/bench/sync")
+
+
+@bench_router.get("/halls", response_model=list[HallOut])
+def sync_list_halls(db: Session = Depends(get_read_db), page: int = 1, limit: int = 10,
+                    location: str | None = None):
+    query = select(Hall).options(selectinload(Hall.amenities)).filter(Hall.deleted == False)
+    query = filter_halls(query, location, None, None).order_by(Hall.id)
+    return db.execute(query.offset((page - 1) * limit).limit(limit + 1)).scalars().all()[:limit]
+
+
+@bench_router.get("/hall/{hall_id}/available-dates")
+def sync_available_dates(hall_id: int, month: str, db: Session = Depends(get_read_db)):
+    start_date, end_date = parse_month(month)
+    bookings = db.execute(
+        select(Booking.start_date, Booking.end_date).filter(
+            Booking.hall_id == hall_id,
+            Booking.status.in_(ACTIVE_STATUSES),
+            Booking.period.overlaps(period_range(
+                datetime.combine(start_date, time(0, 0)),
+                datetime.combine(end_date + timedelta(days=1), time(0, 0)),
+            )),
+        )
+    ).all()
+
+    booked = day_bitmap(bookings, start_date, end_date)
+    return {
+        "hall_id": hall_id,
+        "month": month,
+        "available_dates": [
+            (start_date + timedelta(days=i)).isoformat()
+            for i in free_day_offsets(booked, 0, (end_date - start_date).days)
+        ],
+    }
+
+
+app.include_router(bench_router)
+
+
+# =====================================================================
+#                               DRIVER
+# =====================================================================
+async def load(client: httpx.AsyncClient, make_url, requests: int):
+    rng = random.Random(1)
+    urls = [make_url(rng) for _ in range(requests)]
+    latencies = []
+    queue = asyncio.Queue()
+    for url in urls:
+        queue.put_nowait(url)
+
+    async def worker():
+        while not queue.empty():
+            url = queue.get_nowait()
+            started = perf_counter()
+            response = await client.get(url)
+            response.raise_for_status()
+            latencies.append(perf_counter() - started)
+
+    started = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    elapsed = perf_counter() - started
+
+    latencies.sort()
+    return requests / elapsed, statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+async def run_all():
+    month = date.today().strftime("%Y-%m")
+    cases = [
+        ("list_halls (async)", lambda r: f"/halls/?page={r.randrange(1, 10)}"),
+        ("list_halls (sync)", lambda r: f"/bench/sync/halls?page={r.randrange(1, 10)}"),
+        ("available_dates (async)", lambda r: f"/bookings/hall/{r.randrange(1, HALLS + 1)}/available-dates?month={month}"),
+        ("available_dates (sync)", lambda r: f"/bench/sync/hall/{r.randrange(1, HALLS + 1)}/available-dates?month={month}"),
+    ]
+
+    limits = httpx.Limits(max_connections=CONCURRENCY)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", limits=limits, timeout=60) as client:
+        for _ in range(100):  # wait for the server
+            try:
+                await client.get("/")
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+        else:
+            sys.exit(f"server did not come up on port {PORT}")
+
+        print(f"{'endpoint':<26} {'req/s':>8} {'p50':>9} {'p99':>9}")
+        for name, make_url in cases:
+            await load(client, make_url, CONCURRENCY)  # warm pools
+            rps, p50, p99 = await load(client, make_url, REQUESTS)
+            print(f"{name:<26} {rps:>8.0f} {p50 * 1000:>7.1f}ms {p99 * 1000:>7.1f}ms")
+
+
+def main():
+    seed(reset_schema(), HALLS, DAYS_PER_HALL)
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.sync_vs_async:app",
+         "--port", str(PORT), "--workers", "1", "--log-level", "warning", "--no-access-log"],
+        env=os.environ.copy(),
+    )
+    try:
+        asyncio.run(run_all())
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
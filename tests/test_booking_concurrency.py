@@ -0,0 +1,100 @@
+"""
+Hundreds of parallel booking requests must never produce two active bookings
+for overlapping windows of the same hall. Run with -s to see throughput.
+
+STRESS_REQUESTS / STRESS_WORKERS tune the load (defaults 200 / 50).
+"""
+import os
+import random
+import time as clock
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time, timedelta
+
+from sqlalchemy import text
+
+STRESS_REQUESTS = int(os.getenv("STRESS_REQUESTS", 200))
+STRESS_WORKERS = int(os.getenv("STRESS_WORKERS", 50))
+
+# Any status outside these (a 500, a pool timeout) fails the test
+ACCEPTED = {200}
+REJECTED = {400, 409}
+
+OVERLAPPING_ACTIVE_SQL = text("""
+    SELECT a.id, b.id
+    FROM bookings a
+    JOIN bookings b
+      ON b.hall_id = a.hall_id AND b.id > a.id AND b.period && a.period
+    WHERE a.status IN ('booked', 'held') AND b.status IN ('booked', 'held')
+""")
+
+
+def fire(client, payloads):
+    """POST every (token, body) pair concurrently; returns (status codes, requests/sec)"""
+    def post(item):
+        token, body = item
+        return client.post("/bookings/", params={"token": token}, json=body).status_code
+
+    started = clock.perf_counter()
+    with ThreadPoolExecutor(STRESS_WORKERS) as pool:
+        codes = list(pool.map(post, payloads))
+    return codes, len(payloads) / (clock.perf_counter() - started)
+
+
+def booking_body(hall, day, start, end):
+    return {
+        "hall_id": hall.id,
+        "start_date": day.isoformat(),
+        "end_date": day.isoformat(),
+        "start_time": start.isoformat(),
+        "end_time": end.isoformat(),
+        "payment_mode": "venue",
+    }
+
+
+def test_same_slot_is_booked_exactly_once(client, seed, db_engine):
+    hall = seed.hall()
+    users = [seed.user() for _ in range(20)]
+    day = date.today() + timedelta(days=30)
+
+    payloads = [
+        (seed.token(users[i % len(users)], "user"), booking_body(hall, day, time(10), time(12)))
+        for i in range(STRESS_REQUESTS)
+    ]
+    codes, throughput = fire(client, payloads)
+    print(f"\nsame slot: {STRESS_REQUESTS} requests, {throughput:.0f} req/s, codes {sorted(set(codes))}")
+
+    assert set(codes) <= ACCEPTED | REJECTED
+    assert codes.count(200) == 1
+
+    with db_engine.connect() as conn:
+        active = conn.execute(
+            text("SELECT count(*) FROM bookings WHERE hall_id = :h AND status = 'booked'"), {"h": hall.id}
+        ).scalar()
+    assert active == 1
+
+
+def test_random_overlapping_windows_never_double_book(client, seed, db_engine):
+    halls = [seed.hall() for _ in range(3)]
+    users = [seed.user() for _ in range(20)]
+    first_day = date.today() + timedelta(days=30)
+    rng = random.Random(42)
+
+    payloads = []
+    for i in range(STRESS_REQUESTS):
+        start = rng.randrange(8, 20)
+        end = min(start + rng.randrange(1, 4), 23)
+        payloads.append((
+            seed.token(users[i % len(users)], "user"),
+            booking_body(rng.choice(halls), first_day + timedelta(days=rng.randrange(3)), time(start), time(end)),
+        ))
+
+    codes, throughput = fire(client, payloads)
+    print(f"\nrandom windows: {STRESS_REQUESTS} requests, {throughput:.0f} req/s, "
+          f"{codes.count(200)} booked, {len(codes) - codes.count(200)} rejected")
+
+    assert set(codes) <= ACCEPTED | REJECTED
+
+    with db_engine.connect() as conn:
+        assert conn.execute(OVERLAPPING_ACTIVE_SQL).fetchall() == []
+        booked = conn.execute(text("SELECT count(*) FROM bookings WHERE status = 'booked'")).scalar()
+    assert booked == codes.count(200)
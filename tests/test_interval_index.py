@@ -0,0 +1,43 @@
+"""
+HallIntervalIndex answers must stay conservative when a hall's intervals
+overlap, and past intervals must not pile up.
+"""
+from datetime import date, datetime, time, timedelta
+
+
+def at(day_offset: int, hour: int) -> datetime:
+    return datetime.combine(date.today() + timedelta(days=day_offset), time(hour))
+
+
+def loaded_index():
+    from app.utils.availability import HallIntervalIndex
+
+    index = HallIntervalIndex()
+    index.loaded_from = date.today()
+    return index
+
+
+def test_long_interval_hidden_behind_short_one():
+    index = loaded_index()
+    index.add(1, 1, at(1, 8), at(1, 20))   # long, e.g. stale after a remote cancel + rebook
+    index.add(1, 2, at(1, 9), at(1, 10))   # short, starts later
+
+    assert index.is_free(1, at(1, 12), at(1, 13)) is False
+    assert index.is_free(1, at(1, 20), at(1, 21)) is True
+
+    index.remove(1)
+    assert index.is_free(1, at(1, 12), at(1, 13)) is True
+
+
+def test_past_intervals_are_pruned_on_day_change():
+    index = loaded_index()
+    index.add(1, 1, at(-3, 10), at(-3, 12))
+    index.add(1, 2, at(2, 10), at(2, 12))
+
+    index.loaded_from = date.today() - timedelta(days=3)  # as if loaded three days ago
+    assert index.is_free(1, at(2, 11), at(2, 13)) is False
+
+    assert index.loaded_from == date.today()
+    assert [e[2] for e in index._entries[1]] == [2]
+    assert 1 not in index._by_id
+    assert index.is_free(1, at(-3, 10), at(-3, 11)) is None
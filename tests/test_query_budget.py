@@ -0,0 +1,54 @@
+"""
+Per-endpoint SQL statement budgets. Each endpoint is measured at two result
+sizes: an N+1 regression makes the count grow with the data and fails here.
+Caches are warmed first, so the budget covers the endpoint's own queries only.
+"""
+from datetime import date, timedelta
+
+import pytest
+
+
+def get_ok(client, url, **params):
+    def call():
+        response = client.get(url, params=params)
+        assert response.status_code == 200, response.text
+    return call
+
+
+@pytest.mark.parametrize("bookings", [3, 40])
+def test_hall_bookings_admin(client, seed, count_queries, bookings):
+    hall = seed.hall()
+    users = [seed.user() for _ in range(bookings)]
+    for i, user in enumerate(users):
+        seed.booking(user, hall, date.today() + timedelta(days=i), commit=False)
+    seed.db.commit()
+
+    call = get_ok(client, f"/bookings/admin/hall/{hall.id}", token=seed.token(seed.admin(), "admin"))
+    call()  # warms the principal cache
+
+    # bookings joined with their users
+    assert count_queries(call) == 1
+
+
+@pytest.mark.parametrize("halls", [2, 25])
+def test_admin_panel_halls(client, seed, count_queries, halls):
+    amenities = [seed.amenity(f"amenity {i}") for i in range(5)]
+    for i in range(halls):
+        seed.hall(amenities=amenities[: i % 5 + 1])
+
+    call = get_ok(client, "/admin-panel/halls", token=seed.token(seed.admin(), "admin"))
+    call()
+
+    # halls + one selectin query for every hall's amenities
+    assert count_queries(call) == 2
+
+
+@pytest.mark.parametrize("amenities", [1, 12])
+def test_get_hall(client, seed, count_queries, amenities):
+    hall = seed.hall(amenities=[seed.amenity(f"amenity {i}") for i in range(amenities)])
+
+    call = get_ok(client, f"/halls/{hall.id}")
+    call()
+
+    # hall + its amenities
+    assert count_queries(call) == 2
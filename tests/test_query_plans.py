@@ -0,0 +1,139 @@
+"""
+The hot queries must be answerable from their index. Each endpoint is called
+for real, the SQL it emits is captured, and EXPLAIN is run on it with
+sequential scans disabled. The plan must use one of the expected indexes and
+the hot predicate must be an Index Cond or Recheck Cond: scanning some other
+index in full and applying the predicate as a Filter fails as well.
+"""
+import json
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+HALLS = 20
+DAYS_PER_HALL = 250
+LOCATIONS = ("Hyderabad", "Chennai", "Bengaluru", "Mumbai")
+
+# Indexes each hot predicate is meant to be served by
+BY_USER = ("ix_bookings_user_id",)
+BY_HALL = ("ix_bookings_hall_id_start_date", "ix_bookings_active_hall_dates", "excl_bookings_hall_period")
+BY_LOCATION = ("ix_halls_location_trgm",)
+BY_PERIOD = ("excl_bookings_hall_period", "ix_bookings_period")
+
+
+@contextmanager
+def captured_sql():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(Engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", capture)
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def explain(db_engine, statement, parameters):
+    # Both drivers emit %s placeholders, so psycopg2 can replay either
+    conn = db_engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SET enable_seqscan = off")
+        cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        result = cursor.fetchone()[0]
+        conn.rollback()
+    finally:
+        conn.close()
+
+    plan = result if isinstance(result, list) else json.loads(result)
+    return list(plan_nodes(plan[0]["Plan"]))
+
+
+def plan_problems(nodes, indexes, predicate):
+    problems = []
+
+    used = {node["Index Name"] for node in nodes if "Index Name" in node}
+    if not used & set(indexes):
+        problems.append(f"uses none of {indexes} (uses {sorted(used)})")
+
+    index_conds = [node[key] for node in nodes for key in ("Index Cond", "Recheck Cond") if key in node]
+    if not any(predicate in cond for cond in index_conds):
+        filters = [node[key] for node in nodes for key in ("Filter", "Join Filter") if predicate in node.get(key, "")]
+        problems.append(f"{predicate!r} is not an index condition (filters: {filters})")
+
+    if any(node["Node Type"] == "Seq Scan" for node in nodes):
+        problems.append("Seq Scan")
+
+    return problems
+
+
+def test_hot_queries_use_indexes(client, seed, db_engine):
+    from app.api.routes.bookings import find_conflict
+
+    users = [seed.user() for _ in range(50)]
+    halls = [seed.hall(location=LOCATIONS[i % len(LOCATIONS)], capacity=50 + i * 10) for i in range(HALLS)]
+    admin = seed.admin()
+
+    first_day = date.today() - timedelta(days=DAYS_PER_HALL // 2)
+    for h, hall in enumerate(halls):
+        for d in range(DAYS_PER_HALL):
+            seed.booking(users[(h + d) % len(users)], hall, first_day + timedelta(days=d), commit=False)
+    seed.db.commit()
+    seed.sync_index()
+
+    with db_engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+
+    user_token = seed.token(users[0], "user")
+    admin_token = seed.token(admin, "admin")
+    hall_id = halls[3].id
+    month = date.today().strftime("%Y-%m")
+    window_start = datetime.combine(date.today(), time(9))
+
+    # (name, action, marker identifying the statement under test,
+    #  indexes that may serve it, predicate as it appears in the plan)
+    cases = [
+        ("my bookings", lambda: client.get("/bookings/my", params={"token": user_token}),
+         "bookings.user_id =", BY_USER, "user_id ="),
+        ("admin hall list", lambda: client.get(f"/bookings/admin/hall/{hall_id}", params={"token": admin_token}),
+         "bookings.hall_id =", BY_HALL, "hall_id ="),
+        ("list_halls location ILIKE", lambda: client.get("/halls/", params={"location": "hyder"}),
+         "ILIKE", BY_LOCATION, "~~*"),
+        ("available-dates period &&", lambda: client.get(
+            f"/bookings/hall/{hall_id}/available-dates", params={"month": month}), "&&", BY_PERIOD, "&&"),
+        ("free-slots period &&", lambda: client.get(
+            f"/bookings/hall/{hall_id}/free-slots",
+            params={"start_date": date.today().isoformat(), "end_date": (date.today() + timedelta(days=2)).isoformat()},
+        ), "&&", BY_PERIOD, "&&"),
+        ("available halls anti-join", lambda: client.get("/halls/available", params={
+            "start": window_start.isoformat(), "end": (window_start + timedelta(hours=3)).isoformat(),
+        }), "&&", BY_PERIOD, "&&"),
+        ("find_conflict probe", lambda: find_conflict(
+            seed.db, hall_id, window_start, window_start + timedelta(hours=2)), "&&", BY_PERIOD, "&&"),
+    ]
+
+    failures = []
+    for name, action, marker, indexes, predicate in cases:
+        with captured_sql() as statements:
+            response = action()
+        if hasattr(response, "status_code"):
+            assert response.status_code == 200, (name, response.text)
+
+        matching = [(s, p) for s, p in statements if marker in s]
+        assert matching, f"{name}: no statement containing {marker!r} was issued"
+
+        for statement, parameters in matching:
+            for problem in plan_problems(explain(db_engine, statement, parameters), indexes, predicate):
+                failures.append(f"{name}: {problem}\n  {' '.join(statement.split())}")
+
+    assert not failures, "\n".join(failures)
@@ -0,0 +1,31 @@
+"""
+Recurring-booking patterns that cannot be expanded into sane windows are
+rejected with 400 before anything is written.
+"""
+from datetime import date
+
+import pytest
+
+
+@pytest.mark.parametrize("pattern", [
+    {"freq": "daily", "interval": 10**7, "count": 3},
+    {"freq": "monthly", "interval": 10**6, "count": 3},
+    {"freq": "weekly", "interval": 0, "count": 3},
+    {"freq": "daily", "count": 0},
+    {"freq": "daily", "count": 3, "end_time": "10:00:00"},
+    {"freq": "monthly", "count": 3, "start_date": "9999-11-15"},
+])
+def test_invalid_pattern_is_rejected(client, seed, pattern):
+    hall = seed.hall()
+    body = {
+        "hall_id": hall.id,
+        "start_date": date.today().isoformat(),
+        "start_time": "10:00:00",
+        "end_time": "12:00:00",
+        **pattern,
+    }
+
+    response = client.post("/bookings/recurring", json=body, params={"token": seed.token(seed.user(), "user")})
+
+    assert response.status_code == 400, response.text
+    assert seed.db.execute("SELECT count(*) FROM bookings").scalar() == 0
@@ -0,0 +1,47 @@
+"""
+Sampled requests are logged to app.access with their query counts, including
+queries a streamed body runs after the handler has returned.
+"""
+import json
+import logging
+from datetime import date, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def timed(monkeypatch, caplog):
+    import app.db.query_stats as query_stats
+
+    monkeypatch.setattr(query_stats, "SQL_TIMING_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(query_stats.access_log, "propagate", True)
+    caplog.set_level(logging.INFO, logger="app.access")
+
+    def last_line():
+        return json.loads(caplog.records[-1].getMessage())
+    return last_line
+
+
+def test_complete_response_gets_server_timing(client, seed, timed):
+    seed.hall()
+
+    response = client.get("/halls/")
+
+    assert response.status_code == 200
+    assert 'desc="2 queries"' in response.headers["Server-Timing"]
+    assert timed()["db_queries"] == 2
+
+
+def test_streamed_export_is_counted(client, seed, timed):
+    hall = seed.hall()
+    seed.booking(seed.user(), hall, date.today() + timedelta(days=1))
+
+    response = client.get(
+        f"/bookings/admin/hall/{hall.id}/export",
+        params={"token": seed.token(seed.admin(), "admin"), "format": "csv"},
+    )
+
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 2
+    assert "Server-Timing" not in response.headers
+    assert timed()["db_queries"] >= 1
@@ -0,0 +1,38 @@
+"""
+Booking times are naive wall-clock values: inputs carrying a UTC offset are
+rejected with 400 instead of reaching tsrange() and failing in the driver.
+"""
+from datetime import date, timedelta
+
+import pytest
+
+DAY = (date.today() + timedelta(days=1)).isoformat()
+
+
+@pytest.mark.parametrize("suffix, expected", [("", 200), ("Z", 400), ("+05:30", 400)])
+def test_available_halls_window(client, seed, suffix, expected):
+    seed.hall()
+
+    response = client.get("/halls/available", params={
+        "start": f"{DAY}T10:00:00{suffix}",
+        "end": f"{DAY}T12:00:00{suffix}",
+    })
+
+    assert response.status_code == expected, response.text
+
+
+@pytest.mark.parametrize("url, extra", [
+    ("/bookings/", {"start_date": DAY, "end_date": DAY}),
+    ("/bookings/recurring", {"start_date": DAY, "freq": "daily", "count": 2}),
+])
+def test_booking_times_with_offset(client, seed, url, extra):
+    hall = seed.hall()
+
+    response = client.post(url, params={"token": seed.token(seed.user(), "user")}, json={
+        "hall_id": hall.id,
+        "start_time": "10:00:00Z",
+        "end_time": "12:00:00Z",
+        **extra,
+    })
+
+    assert response.status_code == 400, response.text